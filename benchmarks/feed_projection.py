@@ -0,0 +1,108 @@
+# python -m benchmarks.feed_projection
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.pool import StaticPool
+from src.database.models import Base, Post, PostTag, Tag, User, UserStatusEnum
+from src.repositories.post import PostRepository
+from src.schemas.post import PostResponse
+from src.schemas.tag import TagsShortResponse
+from uuid import uuid4
+
+import asyncio, time, tracemalloc
+
+POSTS = 2_000
+AUTHORS = 50
+TAGS_PER_POST = 3
+ROUNDS = 5
+
+async def orm_hydration(db) -> list[PostResponse]:
+    # the old repository code: full Post and User entities validated from attributes
+    stmt = (
+        select(Post, Post.rating_sum, Post.rating_count)
+        .join(Post.user)
+        .options(joinedload(Post.user), selectinload(Post.tags).selectinload(PostTag.tag))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+    )
+    result = await db.execute(stmt)
+
+    posts = []
+    for post, rating_sum, rating_count in result.all():
+        response = PostResponse.model_validate(post)
+        response.avg_rating = round(rating_sum / rating_count, 2) if rating_count else None
+        response.rating_count = rating_count
+        response.tags = [TagsShortResponse.model_validate(rel.tag) for rel in post.tags if rel.tag is not None]
+        posts.append(response)
+    return posts
+
+async def projection(db) -> list[PostResponse]:
+    return await PostRepository(db).get_posts()
+
+async def seed(session_factory):
+    async with session_factory() as session:
+        authors = [
+            User(
+                id=uuid4(),
+                username=f"author{i}",
+                email=f"author{i}@example.com",
+                password="$2b$12$" + "x" * 53,
+                phone="+100000000",
+                status=UserStatusEnum.active
+            )
+            for i in range(AUTHORS)
+        ]
+        session.add_all(authors)
+        session.add_all(Tag(name=f"tag{i}") for i in range(20))
+
+        now = datetime.now()
+        for i in range(POSTS):
+            post = Post(
+                id=uuid4(),
+                user_id=authors[i % AUTHORS].id,
+                title=f"post {i}",
+                description="lorem ipsum " * 10,
+                image_url="http://example.com/image.jpg",
+                created_at=now - timedelta(seconds=i),
+                updated_at=now,
+                rating_sum=i % 25,
+                rating_count=i % 5
+            )
+            session.add(post)
+            session.add_all(PostTag(post_id=post.id, tag_name=f"tag{(i + n) % 20}") for n in range(TAGS_PER_POST))
+        await session.commit()
+
+async def measure(session_factory, read) -> tuple[float, int]:
+    cpu = []
+    for _ in range(ROUNDS):
+        async with session_factory() as session:
+            started = time.process_time()
+            await read(session)
+            cpu.append(time.process_time() - started)
+
+    async with session_factory() as session:
+        tracemalloc.start()
+        rows = await read(session)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return min(cpu), peak // len(rows)
+
+async def main():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    await seed(session_factory)
+
+    for name, read in (("ORM hydration", orm_hydration), ("column projection", projection)):
+        cpu, peak_per_row = await measure(session_factory, read)
+        print(
+            f"{name:<18} {POSTS} posts: {cpu / POSTS * 1e6:7.1f} us CPU/row, "
+            f"{peak_per_row:6d} B peak memory/row"
+        )
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+# python -m benchmarks.login_event_loop_latency
+from src.core.security import security
+
+import asyncio, statistics, time
+
+CONCURRENT_LOGINS = 16
+TICK_SECONDS = 0.005
+
+async def measure_loop_lag(stop: asyncio.Event) -> list[float]:
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - started - TICK_SECONDS)
+    return lags
+
+async def blocking_login(hashed: str):
+    # the old handler: bcrypt runs on the event loop thread
+    return security.verify_password("secret-password", hashed)
+
+async def pooled_login(hashed: str):
+    return await security.verify_password_async("secret-password", hashed)
+
+async def run_scenario(login, hashed: str) -> tuple[float, list[float]]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_loop_lag(stop))
+    await asyncio.sleep(TICK_SECONDS * 4)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login(hashed) for _ in range(CONCURRENT_LOGINS)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    return elapsed, await ticker
+
+async def main():
+    hashed = security.get_password_hash("secret-password")
+
+    for name, login in (("blocking verify", blocking_login), ("worker pool verify", pooled_login)):
+        elapsed, lags = await run_scenario(login, hashed)
+        lags_ms = sorted(lag * 1000 for lag in lags)
+        p99 = lags_ms[int(len(lags_ms) * 0.99) - 1] if len(lags_ms) > 1 else lags_ms[0]
+        print(
+            f"{name:<20} {CONCURRENT_LOGINS} logins in {elapsed:6.2f}s | "
+            f"loop lag median {statistics.median(lags_ms):7.2f} ms, "
+            f"p99 {p99:7.2f} ms, max {lags_ms[-1]:7.2f} ms"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
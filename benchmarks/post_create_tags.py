@@ -0,0 +1,103 @@
+# python -m benchmarks.post_create_tags
+# BENCH_DATABASE_URL points it at another database, e.g. a local postgres
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.future import select
+from src.conf.config import settings
+from src.core.principal import Principal
+from src.database.models import Base, Post, PostTag, Tag, User, UserStatusEnum
+from src.repositories.post import PostRepository
+from src.schemas.post import PostCreateModel, PostCreateResponse, TagModel
+from uuid import uuid4
+
+import asyncio, os, statistics, time
+
+DATABASE_URL = os.environ.get("BENCH_DATABASE_URL", "sqlite+aiosqlite:///./bench_post_create.db")
+ROUNDS = 50
+
+async def legacy_create(db, post_data: PostCreateModel, user: Principal):
+    # the old repository code: lookups, inserts and a commit per tag
+    post = Post(
+        user_id=user.id,
+        title=post_data.title,
+        description=post_data.description,
+        image_url=post_data.image_url,
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    db.add(post)
+    await db.flush()
+
+    for tag_model in post_data.tags:
+        result = await db.execute(select(Tag).where(Tag.name == tag_model.name))
+        if not result.scalar_one_or_none():
+            db.add(Tag(name=tag_model.name))
+            await db.flush()
+
+        result = await db.execute(
+            select(PostTag).where(PostTag.post_id == post.id, PostTag.tag_name == tag_model.name)
+        )
+        if not result.scalar_one_or_none():
+            db.add(PostTag(post_id=post.id, tag_name=tag_model.name))
+
+        await db.commit()
+        await db.refresh(post)
+
+    return PostCreateResponse.model_validate(post)
+
+async def batched_create(db, post_data: PostCreateModel, user: Principal):
+    return await PostRepository(db).create(post_data, user)
+
+async def main():
+    engine = create_async_engine(DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+
+    async with session_factory() as session:
+        user = User(
+            username=f"bench_{uuid4().hex[:8]}",
+            email=f"bench_{uuid4().hex[:8]}@example.com",
+            password="x",
+            status=UserStatusEnum.active
+        )
+        session.add(user)
+        await session.commit()
+        principal = Principal(id=user.id, username=user.username, status=user.status, roles=frozenset(), permissions=frozenset())
+
+    for tag_count in sorted({1, 5, settings.MAX_POST_TAGS}):
+        for name, create in (("per-tag loop", legacy_create), ("batched upsert", batched_create)):
+            timings = []
+            for i in range(ROUNDS):
+                # half of the tags already exist, half are new
+                post_data = PostCreateModel(
+                    title="bench",
+                    description="bench",
+                    image_url="http://example.com/bench.jpg",
+                    tags=[
+                        TagModel(name=f"bench-{n}" if n % 2 else f"bench-{uuid4().hex[:8]}")
+                        for n in range(tag_count)
+                    ]
+                )
+                async with session_factory() as session:
+                    statements.clear()
+                    started = time.perf_counter()
+                    await create(session, post_data, principal)
+                    timings.append(time.perf_counter() - started)
+
+            print(
+                f"{tag_count:>2} tags  {name:<15} median {statistics.median(timings) * 1000:7.2f} ms, "
+                f"max {max(timings) * 1000:7.2f} ms, {len(statements)} statements"
+            )
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
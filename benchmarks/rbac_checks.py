@@ -0,0 +1,48 @@
+# python -m benchmarks.rbac_checks
+from src.core.principal import Principal
+from src.core.rbac import permission_bits, role_bits
+from src.database.models import Permission, Role, User
+from uuid import uuid4
+
+import timeit
+
+ITERATIONS = 200_000
+
+def build_user() -> User:
+    permissions = [
+        Permission(name=name)
+        for name in ("update_all_posts", "delete_all_comments", "update_all_comments", "delete_all_posts")
+    ]
+    return User(
+        id=uuid4(),
+        username="bench",
+        status="active",
+        roles=[Role(name="user"), Role(name="moderator", permissions=permissions[:3])],
+    )
+
+def set_based_check(user: User) -> bool:
+    # what the dependencies did per request before the bitsets
+    roles = {r.name for r in user.roles}
+    if roles.intersection({"admin", "moderator"}):
+        return True
+    user_permissions = {p.name for r in user.roles for p in r.permissions}
+    return "delete_all_posts" in user_permissions
+
+def run():
+    user = build_user()
+    principal = Principal.from_user(user)
+    elevated = role_bits.mask(("admin", "moderator"))
+    required = permission_bits.bit("delete_all_posts")
+
+    def bitset_check() -> bool:
+        return bool(principal.role_mask & elevated or principal.permission_mask & required)
+
+    for name, check in (
+        ("set rebuild on ORM user", lambda: set_based_check(user)),
+        ("precomputed bitmask", bitset_check),
+    ):
+        seconds = min(timeit.repeat(check, number=ITERATIONS, repeat=5))
+        print(f"{name:<26} {seconds / ITERATIONS * 1e9:8.1f} ns/check")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,36 @@
+# python -m benchmarks.token_decode
+from datetime import datetime, timedelta
+from src.conf.config import settings
+from src.core.security import HS256Codec, JoseCodec, Security
+from uuid import uuid4
+
+import timeit
+
+ITERATIONS = 20_000
+
+def run():
+    claims = {
+        "sub": str(uuid4()),
+        "name": "bench",
+        "roles": ["moderator", "user"],
+        "perms": ["delete_all_comments", "update_all_comments", "update_all_posts"],
+        "ver": 0,
+        "exp": datetime.now() + timedelta(minutes=30),
+    }
+    token = JoseCodec("HS256").encode(claims, settings.SECRET_KEY)
+
+    jose = JoseCodec("HS256")
+    hs256 = HS256Codec()
+    cached = Security(codec=jose)
+    cached.decode_access_token(token)
+
+    for name, decode in (
+        ("python-jose", lambda: jose.decode(token, settings.SECRET_KEY)),
+        ("stdlib HS256", lambda: hs256.decode(token, settings.SECRET_KEY)),
+        ("cached (digest lookup)", lambda: cached.decode_access_token(token)),
+    ):
+        seconds = min(timeit.repeat(decode, number=ITERATIONS, repeat=5))
+        print(f"{name:<24} {seconds / ITERATIONS * 1e6:8.2f} µs/decode")
+
+if __name__ == "__main__":
+    run()
@@ -1,14 +1,40 @@
-from src.routes import auth, cloudinary, comment, post, user
+from contextlib import asynccontextmanager, suppress
+from src.commands.purge_refresh_tokens import run_refresh_token_purge
+from src.core.rbac import load_rbac_bits
+from src.core.request_stats import RequestStatsMiddleware
+from src.core.response_cache import response_cache
+from src.database.db import sessionmanager
+from src.routes import auth, cloudinary, comment, health, metrics, post, tag, user
+from src.services.cloudinary import UploadFileService
 from fastapi import FastAPI
 
+import asyncio
 import uvicorn
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    UploadFileService.configure_cloudinary()
+    await sessionmanager.warm_up()
+    async with sessionmanager.session() as db:
+        await load_rbac_bits(db)
+    purge_task = asyncio.create_task(run_refresh_token_purge())
+    yield
+    purge_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await purge_task
+    await response_cache.close()
+    await sessionmanager.close()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestStatsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(cloudinary.router)
 app.include_router(comment.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(post.router)
+app.include_router(tag.router)
 app.include_router(user.router)
 
 @app.get("/")
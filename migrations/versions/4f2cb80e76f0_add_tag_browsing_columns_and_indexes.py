@@ -0,0 +1,78 @@
+"""add tag browsing columns and indexes
+
+Revision ID: 4f2cb80e76f0
+Revises: 96692d4cb84b
+Create Date: 2026-10-18 14:12:40.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2cb80e76f0'
+down_revision: Union[str, None] = '96692d4cb84b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tags', sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('post_tags', sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE post_tags SET created_at = (
+            SELECT posts.created_at FROM posts WHERE posts.id = post_tags.post_id
+        )
+        """
+    )
+    op.execute("UPDATE post_tags SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute(
+        """
+        UPDATE tags SET post_count = (
+            SELECT COUNT(post_tags.id) FROM post_tags WHERE post_tags.tag_name = tags.name
+        )
+        """
+    )
+
+    with op.batch_alter_table('post_tags') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    if is_postgresql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # built concurrently on Postgres so writes are not blocked on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_post_tags_tag_name_created_at_post_id', 'post_tags',
+            ['tag_name', 'created_at', 'post_id'], postgresql_concurrently=True
+        )
+        if is_postgresql:
+            op.create_index(
+                'ix_tags_name_pattern', 'tags', ['name'],
+                postgresql_ops={'name': 'text_pattern_ops'}, postgresql_concurrently=True
+            )
+            op.create_index(
+                'ix_tags_name_trgm', 'tags', ['name'], postgresql_using='gin',
+                postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        if op.get_bind().dialect.name == 'postgresql':
+            op.drop_index('ix_tags_name_trgm', table_name='tags', postgresql_concurrently=True)
+            op.drop_index('ix_tags_name_pattern', table_name='tags', postgresql_concurrently=True)
+        op.drop_index(
+            'ix_post_tags_tag_name_created_at_post_id', table_name='post_tags', postgresql_concurrently=True
+        )
+
+    with op.batch_alter_table('post_tags') as batch_op:
+        batch_op.drop_column('created_at')
+    op.drop_column('tags', 'post_count')
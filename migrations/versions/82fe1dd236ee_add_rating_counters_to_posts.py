@@ -0,0 +1,46 @@
+"""add rating counters to posts
+
+Revision ID: 82fe1dd236ee
+Revises: 86cb0de5e718
+Create Date: 2026-10-18 10:03:17.511842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '82fe1dd236ee'
+down_revision: Union[str, None] = '86cb0de5e718'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+
+    # backfill from existing ratings; re-run later with
+    # `python -m src.commands.backfill_post_ratings` if counters ever drift
+    op.execute(
+        """
+        UPDATE posts SET
+            rating_sum = (
+                SELECT COALESCE(SUM(post_ratings.rating), 0)
+                FROM post_ratings WHERE post_ratings.post_id = posts.id
+            ),
+            rating_count = (
+                SELECT COUNT(post_ratings.id)
+                FROM post_ratings WHERE post_ratings.post_id = posts.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'rating_count')
+    op.drop_column('posts', 'rating_sum')
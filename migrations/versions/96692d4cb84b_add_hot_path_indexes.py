@@ -0,0 +1,75 @@
+"""add hot path indexes
+
+Revision ID: 96692d4cb84b
+Revises: 82fe1dd236ee
+Create Date: 2026-10-18 11:26:52.730941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '96692d4cb84b'
+down_revision: Union[str, None] = '82fe1dd236ee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_comments_post_id_created_at_id', 'comments', ['post_id', 'created_at', 'id'], False),
+    ('ix_comments_user_id', 'comments', ['user_id'], False),
+    ('ix_post_ratings_post_id', 'post_ratings', ['post_id'], False),
+    ('uq_post_ratings_user_id_post_id', 'post_ratings', ['user_id', 'post_id'], True),
+    ('ix_post_tags_post_id', 'post_tags', ['post_id'], False),
+    ('ix_post_tags_tag_name_post_id', 'post_tags', ['tag_name', 'post_id'], False),
+    ('ix_posts_user_id', 'posts', ['user_id'], False),
+    ('ix_refresh_tokens_user_id', 'refresh_tokens', ['user_id'], False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # one rating per user and post. post_ratings has no timestamp, so there
+    # is no newest row to prefer: the duplicate with the lowest id survives,
+    # an arbitrary but repeatable choice
+    op.execute(
+        """
+        DELETE FROM post_ratings WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, post_id ORDER BY id
+                ) AS row_number
+                FROM post_ratings
+            ) ranked
+            WHERE ranked.row_number > 1
+        )
+        """
+    )
+    # the denormalized counters are rebuilt from the surviving rows
+    op.execute(
+        """
+        UPDATE posts SET
+            rating_sum = (
+                SELECT COALESCE(SUM(post_ratings.rating), 0)
+                FROM post_ratings WHERE post_ratings.post_id = posts.id
+            ),
+            rating_count = (
+                SELECT COUNT(post_ratings.id)
+                FROM post_ratings WHERE post_ratings.post_id = posts.id
+            )
+        """
+    )
+
+    # built concurrently on Postgres so writes are not blocked on large tables
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
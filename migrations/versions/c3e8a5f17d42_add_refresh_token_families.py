@@ -0,0 +1,40 @@
+"""add refresh token families
+
+Revision ID: c3e8a5f17d42
+Revises: b7c41d2e9a03
+Create Date: 2026-10-18 18:02:33.540219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a5f17d42'
+down_revision: Union[str, None] = 'b7c41d2e9a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('family_id', sa.Uuid(), nullable=True))
+    # rows written before rotation existed each start their own family
+    op.execute("UPDATE refresh_tokens SET family_id = id")
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.alter_column('family_id', existing_type=sa.Uuid(), nullable=False)
+
+    op.create_index('ix_refresh_tokens_family_id', 'refresh_tokens', ['family_id'], unique=False)
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_family_id', table_name='refresh_tokens')
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.drop_column('family_id')
@@ -0,0 +1,103 @@
+"""add post search vector
+
+Revision ID: e0fe96919e9f
+Revises: 4f2cb80e76f0
+Create Date: 2026-10-18 16:05:12.804113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0fe96919e9f'
+down_revision: Union[str, None] = '4f2cb80e76f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION post_search_vector(uuid, text, text) RETURNS tsvector
+    LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('english', coalesce($2, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(
+                (SELECT string_agg(tag_name, ' ') FROM post_tags WHERE post_tags.post_id = $1), ''
+            )), 'B')
+            || setweight(to_tsvector('english', coalesce($3, '')), 'C')
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION posts_search_vector_refresh() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := post_search_vector(NEW.id, NEW.title, NEW.description);
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION post_tags_search_vector_refresh() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE posts SET search_vector = post_search_vector(posts.id, posts.title, posts.description)
+        WHERE posts.id IN (SELECT DISTINCT post_id FROM changed_tags);
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER posts_search_vector_refresh
+    BEFORE INSERT OR UPDATE OF title, description ON posts
+    FOR EACH ROW EXECUTE FUNCTION posts_search_vector_refresh()
+    """,
+    """
+    CREATE TRIGGER post_tags_search_vector_insert
+    AFTER INSERT ON post_tags REFERENCING NEW TABLE AS changed_tags
+    FOR EACH STATEMENT EXECUTE FUNCTION post_tags_search_vector_refresh()
+    """,
+    """
+    CREATE TRIGGER post_tags_search_vector_delete
+    AFTER DELETE ON post_tags REFERENCING OLD TABLE AS changed_tags
+    FOR EACH STATEMENT EXECUTE FUNCTION post_tags_search_vector_refresh()
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        # the SQLite fallback searches the plain columns, the vector stays empty
+        op.add_column('posts', sa.Column('search_vector', sa.String(), nullable=True))
+        return
+
+    op.add_column('posts', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    for statement in SEARCH_DDL:
+        op.execute(statement)
+    op.execute("UPDATE posts SET search_vector = post_search_vector(id, title, description)")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_search_vector', 'posts', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_posts_search_vector', table_name='posts', postgresql_concurrently=True)
+
+        op.execute("DROP TRIGGER IF EXISTS post_tags_search_vector_delete ON post_tags")
+        op.execute("DROP TRIGGER IF EXISTS post_tags_search_vector_insert ON post_tags")
+        op.execute("DROP TRIGGER IF EXISTS posts_search_vector_refresh ON posts")
+        op.execute("DROP FUNCTION IF EXISTS post_tags_search_vector_refresh()")
+        op.execute("DROP FUNCTION IF EXISTS posts_search_vector_refresh()")
+        op.execute("DROP FUNCTION IF EXISTS post_search_vector(uuid, text, text)")
+
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('search_vector')
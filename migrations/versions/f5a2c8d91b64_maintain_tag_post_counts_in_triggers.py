@@ -0,0 +1,87 @@
+"""maintain tag post counts in triggers
+
+Revision ID: f5a2c8d91b64
+Revises: c3e8a5f17d42
+Create Date: 2026-10-18 20:14:06.271538
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a2c8d91b64'
+down_revision: Union[str, None] = 'c3e8a5f17d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TAG_COUNT_DDL = {
+    'postgresql': (
+        """
+        CREATE OR REPLACE FUNCTION post_tags_count_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE tags SET post_count = tags.post_count
+                + CASE TG_OP WHEN 'INSERT' THEN changed.links ELSE -changed.links END
+            FROM (SELECT tag_name, COUNT(*) AS links FROM changed_tags GROUP BY tag_name) changed
+            WHERE tags.name = changed.tag_name;
+            RETURN NULL;
+        END
+        $$
+        """,
+        """
+        CREATE TRIGGER post_tags_count_insert
+        AFTER INSERT ON post_tags REFERENCING NEW TABLE AS changed_tags
+        FOR EACH STATEMENT EXECUTE FUNCTION post_tags_count_refresh()
+        """,
+        """
+        CREATE TRIGGER post_tags_count_delete
+        AFTER DELETE ON post_tags REFERENCING OLD TABLE AS changed_tags
+        FOR EACH STATEMENT EXECUTE FUNCTION post_tags_count_refresh()
+        """,
+    ),
+    'sqlite': (
+        """
+        CREATE TRIGGER post_tags_count_insert AFTER INSERT ON post_tags
+        BEGIN
+            UPDATE tags SET post_count = post_count + 1 WHERE name = NEW.tag_name;
+        END
+        """,
+        """
+        CREATE TRIGGER post_tags_count_delete AFTER DELETE ON post_tags
+        BEGIN
+            UPDATE tags SET post_count = post_count - 1 WHERE name = OLD.tag_name;
+        END
+        """,
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in TAG_COUNT_DDL.get(op.get_bind().dialect.name, ()):
+        op.execute(statement)
+
+    # counts drifted by cascaded deletes before the triggers existed
+    op.execute(
+        """
+        UPDATE tags SET post_count = (
+            SELECT COUNT(post_tags.id) FROM post_tags WHERE post_tags.tag_name = tags.name
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS post_tags_count_delete ON post_tags")
+        op.execute("DROP TRIGGER IF EXISTS post_tags_count_insert ON post_tags")
+        op.execute("DROP FUNCTION IF EXISTS post_tags_count_refresh()")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS post_tags_count_delete")
+        op.execute("DROP TRIGGER IF EXISTS post_tags_count_insert")
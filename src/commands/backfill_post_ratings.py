@@ -0,0 +1,21 @@
+from src.core.response_cache import invalidate_posts
+from src.database.db import sessionmanager
+from src.database.models import recount_post_ratings_stmt
+from src.services.utils import logger
+
+import asyncio
+
+async def backfill_post_ratings() -> int:
+    async with sessionmanager.session() as db:
+        result = await db.execute(recount_post_ratings_stmt())
+        await db.commit()
+
+    # only reaches a shared (redis) cache, in-process caches expire on their own
+    await invalidate_posts()
+
+    logger.info("Rating counters recalculated for %d posts", result.rowcount)
+    return result.rowcount
+
+if __name__ == "__main__":
+    # python -m src.commands.backfill_post_ratings
+    print(f"Updated {asyncio.run(backfill_post_ratings())} posts")
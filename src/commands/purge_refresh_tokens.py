@@ -0,0 +1,36 @@
+from src.conf.config import settings
+from src.database.db import sessionmanager
+from src.repositories.refresh_token import RefreshTokenRepository
+from src.services.utils import logger
+from sqlalchemy.exc import SQLAlchemyError
+
+import asyncio
+
+async def purge_refresh_tokens(batch_size: int = settings.REFRESH_TOKEN_PURGE_BATCH_SIZE) -> int:
+    # short transactions of at most batch_size rows, so the purge never holds
+    # locks that refresh requests would queue behind
+    deleted = 0
+    while True:
+        async with sessionmanager.session() as db:
+            batch = await RefreshTokenRepository(db).purge_expired(batch_size)
+
+        deleted += batch
+        if batch < batch_size:
+            break
+        await asyncio.sleep(0)
+
+    logger.info("Purged %d expired refresh tokens", deleted)
+    return deleted
+
+async def run_refresh_token_purge(interval: float = settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS):
+    # started from the app lifespan and cancelled on shutdown
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await purge_refresh_tokens()
+        except SQLAlchemyError as e:
+            logger.error("Refresh token purge failed: %s", e)
+
+if __name__ == "__main__":
+    # python -m src.commands.purge_refresh_tokens
+    print(f"Deleted {asyncio.run(purge_refresh_tokens())} refresh tokens")
@@ -2,6 +2,7 @@ from pathlib import Path
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from pydantic import Field
+from typing import Literal, Optional
 from src.conf.config_init import InitialSettings
 
 init_settings = InitialSettings()
@@ -15,6 +16,13 @@ env_file = str(env_file_path) if env_file_path.exists() else None
 class Settings(BaseSettings):
     ENV_APP: str = env_name
     DB_URL: str = Field(..., alias="DATABASE_URL")
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: int = 60
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
     ALGORITHM: str
@@ -24,7 +32,44 @@ class Settings(BaseSettings):
     CLD_NAME: str
     CLD_API_KEY: int
     CLD_API_SECRET: str
+    CLD_UPLOAD_PREFIX: Optional[str] = None
+    CLD_UPLOAD_CHUNK_SIZE: int = 6_000_000
+    CLD_MAX_CONCURRENT_UPLOADS: int = 4
+    CLD_MAX_PENDING_UPLOADS: int = 16
     MAX_POST_TAGS: int
+    POSTS_PAGE_SIZE: int = 20
+    POSTS_MAX_PAGE_SIZE: int = 100
+    COMMENTS_PAGE_SIZE: int = 50
+    COMMENTS_MAX_PAGE_SIZE: int = 200
+    SEARCH_MAX_OFFSET: int = 1000
+    TAG_SUGGESTIONS_LIMIT: int = 10
+    TAG_SUGGESTIONS_MAX_LIMIT: int = 50
+    # "memory" is per process: an invalidation only reaches the worker that
+    # made the write, others serve stale pages for up to the TTL. It falls back
+    # to "none" when WEB_CONCURRENCY > 1; use "redis" with several workers
+    RESPONSE_CACHE_BACKEND: Literal["memory", "redis", "none"] = "memory"
+    RESPONSE_CACHE_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAX_SIZE: int = 2048
+    RESPONSE_CACHE_TIMEOUT: float = 0.25
+    # worker processes, the variable uvicorn and gunicorn read for --workers
+    WEB_CONCURRENCY: int = 1
+    QR_CACHE_MAX_SIZE: int = 1024
+    QR_RENDER_WORKERS: int = 2
+    QR_MAX_PENDING_RENDERS: int = 32
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    CLAIMS_TTL_SECONDS: int = 300
+    TOKEN_CODEC: Literal["jose", "hs256"] = "jose"
+    TOKEN_DECODE_CACHE_MAX_SIZE: int = 10000
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = 1000
+    LOG_FILE: str = "app.log"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_THRESHOLD_MS: float | None = None
+    SLOW_QUERY_LOG_LIMIT: int = 5
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
 
     model_config = ConfigDict(
         env_file=env_file,                    
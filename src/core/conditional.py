@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response, status
+from hashlib import sha1
+
+# validators for conditional GETs; rows are the narrow version tuples the
+# repositories return (ids, updated_at, counters), never full payloads
+
+def make_etag(rows) -> str:
+    digest = sha1(repr([tuple(row) for row in rows]).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def make_last_modified(rows) -> str | None:
+    moments = [value for row in rows for value in row if isinstance(value, datetime)]
+    if not moments:
+        return None
+
+    # timestamps are stored as naive local time (datetime.now()), astimezone
+    # reads them as such before the HTTP date is written in GMT
+    latest = max(moments).astimezone(timezone.utc)
+
+    return format_datetime(latest.replace(microsecond=0), usegmt=True)
+
+def validator_headers(rows, last_modified: bool = False) -> dict[str, str]:
+    headers = {"ETag": make_etag(rows)}
+
+    # Last-Modified is only sound when every change covered by the ETag also
+    # moves a timestamp in rows. None of the version queries promise that: a
+    # delete, or an insert with an older timestamp, leaves a page's newest
+    # timestamp alone, and a rating moves the post counters but no timestamp
+    if last_modified and (modified := make_last_modified(rows)):
+        headers["Last-Modified"] = modified
+
+    return headers
+
+def _parse_http_date(value: str) -> datetime | None:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    # "-0000" parses naive (RFC 5322: UTC, local offset unknown)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+
+    return parsed
+
+def is_not_modified(request: Request, headers: dict[str, str]) -> bool:
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110 13.2.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+
+        etag = headers.get("ETag", "").removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since and last_modified:
+        since = _parse_http_date(if_modified_since)
+        modified = _parse_http_date(last_modified)
+        return since is not None and modified is not None and modified <= since
+
+    return False
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -1,17 +1,24 @@
+from src.core.principal import Principal
+from src.core.rbac import permission_bits, role_bits
 from src.database.db import get_db 
 from src.database.models import Comment, Post, User
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from src.services.auth import get_current_user
+from src.services.auth import get_claims_principal, get_current_user
 from src.services.utils import logger
 from fastapi import Depends, HTTPException, status
 from uuid import UUID
 
+ELEVATED_ROLES = role_bits.mask(("admin", "moderator"))
+ADMIN_ROLE = role_bits.bit("admin")
+
 def user_has_access(access_type):
+    all_posts_permission = permission_bits.bit(f"{access_type}_all_posts")
+
     async def checker(
         post_id: UUID,
         db: AsyncSession = Depends(get_db),
-        user: User = Depends(get_current_user),
+        user: Principal = Depends(get_current_user),
     ) -> Post:
         stmt = select(Post).where(Post.id == post_id)
         result = await db.execute(stmt)
@@ -25,15 +32,11 @@ def user_has_access(access_type):
             return post
 
         # is has elevated role
-        roles = {r.name for r in user.roles}
-        if roles.intersection({"admin", "moderator"}):
+        if user.role_mask & ELEVATED_ROLES:
             return post
 
         # is has permission
-        user_permissions = {
-            p.name for r in user.roles for p in r.permissions
-        }
-        if f"{access_type}_all_posts" in user_permissions:
+        if user.permission_mask & all_posts_permission:
             return post
 
         # if no valid permission
@@ -41,11 +44,26 @@ def user_has_access(access_type):
 
     return Depends(checker)
 
+def post_write_owner(access_type):
+    all_posts_permission = permission_bits.bit(f"{access_type}_all_posts")
+
+    # resolved from the principal alone, the post is checked by the write itself:
+    # None lets the statement touch any post, a user id only the user's own
+    async def checker(user: Principal = Depends(get_current_user)) -> UUID | None:
+        if user.role_mask & ELEVATED_ROLES or user.permission_mask & all_posts_permission:
+            return None
+
+        return user.id
+
+    return Depends(checker)
+
 def user_has_access_to_comment(access_type):
+    all_comments_permission = permission_bits.bit(f"{access_type}_all_comments")
+
     async def checker(
         comment_id: UUID,
         db: AsyncSession = Depends(get_db),
-        user: User = Depends(get_current_user),
+        user: Principal = Depends(get_current_user),
     ) -> Comment:
         stmt = select(Comment).where(Comment.id == comment_id)
         result = await db.execute(stmt)
@@ -55,19 +73,14 @@ def user_has_access_to_comment(access_type):
             raise HTTPException(status_code=404, detail="Comment not found")
 
         # is author
-        print(f"Comment user id: {comment.user_id}")
-        print(f"User id: {user.id}")
+        logger.debug("Comment %s by user %s, requested by %s", comment_id, comment.user_id, user.id)
         if comment.user_id == user.id:
             return comment
 
         # is has elevated role
-        roles = {r.name for r in user.roles}
-        if roles.intersection({"admin", "moderator"}):
+        if user.role_mask & ELEVATED_ROLES:
             # is has permission
-            user_permissions = {
-                p.name for r in user.roles for p in r.permissions
-            }
-            if f"{access_type}_all_comments" in user_permissions:
+            if user.permission_mask & all_comments_permission:
                 return comment
 
         # if no valid permission
@@ -79,7 +92,7 @@ def can_update_account():
     async def account_checker(
         account_id: UUID,
         db: AsyncSession = Depends(get_db),
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
     ):
         stmt = select(User).where(User.id == account_id)
         result = await db.execute(stmt)
@@ -91,8 +104,7 @@ def can_update_account():
         if account_id == user.id:
             return account
         
-        roles = {r.name for r in user.roles}
-        if roles.intersection({"admin"}):
+        if user.role_mask & ADMIN_ROLE:
             return account
         
         raise HTTPException(status_code=403, detail=f"You cannot update this account")
@@ -103,7 +115,7 @@ def can_view_account():
     async def account_checker(
         account_id: UUID,
         db: AsyncSession = Depends(get_db),
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
     ):
         stmt = select(User).where(User.id == account_id)
         result = await db.execute(stmt)
@@ -115,8 +127,7 @@ def can_view_account():
         if account_id == user.id:
             return account
         
-        roles = {r.name for r in user.roles}
-        if roles.intersection({"admin"}):
+        if user.role_mask & ADMIN_ROLE:
             return account
         
         raise HTTPException(status_code=403, detail=f"You cannot view this account")
@@ -124,8 +135,10 @@ def can_view_account():
     return Depends(account_checker)
 
 def require_role(role_name: str):
-    async def role_checker(current_user: User = Depends(get_current_user)):
-        if not any(role.name == role_name for role in current_user.roles):
+    required_role = role_bits.bit(role_name)
+
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
+        if not current_user.role_mask & required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied: insufficient role",
@@ -133,22 +146,27 @@ def require_role(role_name: str):
         return current_user
     return Depends(role_checker)
 
-def require_permission(permission_name: str):
-    async def checker(user: User = Depends(get_current_user)):
-        logger.info(f"Checking permission for user: {user.id}")
-        logger.info(f"user.roles: {user.roles} (type={type(user.roles)})")
+def require_claims_role(role_name: str):
+    required_role = role_bits.bit(role_name)
 
-        for role in user.roles:
-            logger.info(f"role: {role.name} (type={type(role)})")
-            logger.info(f"permissions: {role.permissions} (type={type(role.permissions)})")
+    # for routes that only need who the caller is, answered from the token's
+    # signed claims without a user lookup
+    async def role_checker(current_user: Principal = Depends(get_claims_principal)):
+        if not current_user.role_mask & required_role:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: insufficient role",
+            )
+        return current_user
+    return Depends(role_checker)
+
+def require_permission(permission_name: str):
+    required_permission = permission_bits.bit(permission_name)
 
-        user_permissions = {
-            perm.name
-            for role in user.roles
-            for perm in role.permissions
-        }
+    async def checker(user: Principal = Depends(get_current_user)):
+        logger.debug("Checking permission %s for user: %s", permission_name, user.id)
 
-        if permission_name not in user_permissions:
+        if not user.permission_mask & required_permission:
             raise HTTPException(
                 status_code=403,
                 detail=f"Missing permission: {permission_name}"
@@ -0,0 +1,23 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from fastapi import HTTPException
+from uuid import UUID
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = urlsafe_b64decode(padded).decode().split("|")
+        created_at = datetime.fromisoformat(created_at)
+        item_id = UUID(item_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # the keyset columns are naive, an offset would never compare as intended
+    if created_at.tzinfo is not None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return created_at, item_id
@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+from src.conf.config import settings
+from src.core.cache import LRUCache
+from src.core.rbac import permission_bits, role_bits
+from src.database.models import User, UserStatusEnum
+from time import time
+from typing import Any
+from uuid import UUID
+
+# immutable snapshot of an authenticated user, safe to share between requests
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: UUID
+    username: str
+    status: UserStatusEnum
+    roles: frozenset[str]
+    permissions: frozenset[str]
+    token_version: int = 0
+    role_mask: int = field(init=False)
+    permission_mask: int = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "role_mask", role_bits.mask(self.roles))
+        object.__setattr__(self, "permission_mask", permission_bits.mask(self.permissions))
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            status=user.status,
+            roles=frozenset(role.name for role in user.roles),
+            permissions=frozenset(
+                perm.name for role in user.roles for perm in role.permissions
+            ),
+            token_version=user.token_version or 0,
+        )
+
+    def to_claims(self) -> dict[str, Any]:
+        # signed into the access token; "cexp" bounds how long they are trusted
+        # without a lookup, independently of the token's own "exp"
+        now = int(time())
+        return {
+            "name": self.username,
+            "roles": sorted(self.roles),
+            "perms": sorted(self.permissions),
+            "ver": self.token_version,
+            "iat": now,
+            "cexp": now + settings.CLAIMS_TTL_SECONDS,
+        }
+
+    @classmethod
+    def from_claims(cls, user_id: UUID, payload: dict[str, Any]) -> "Principal":
+        # tokens are only issued to active users and a ban bumps token_version
+        return cls(
+            id=user_id,
+            username=payload["name"],
+            status=UserStatusEnum.active,
+            roles=frozenset(payload["roles"]),
+            permissions=frozenset(payload["perms"]),
+            token_version=payload["ver"],
+        )
+
+# revocations seen by this process. Claims are trusted for CLAIMS_TTL_SECONDS
+# at most, so a revocation only has to be remembered that long; other processes
+# fall back to the lookup once the claims expire.
+class ClaimsRevocations:
+    def __init__(self, maxsize: int, ttl: float):
+        self._versions = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._not_before = 0.0
+
+    def revoke_user(self, user_id: UUID, token_version: int) -> None:
+        self._versions.set(user_id, token_version)
+
+    def revoke_all(self) -> None:
+        self._not_before = time()
+
+    def trusts(self, user_id: UUID, payload: dict[str, Any]) -> bool:
+        if payload.get("cexp", 0) <= time() or payload.get("iat", 0) < self._not_before:
+            return False
+
+        current = self._versions.get(user_id)
+        return current is None or payload["ver"] >= current
+
+principal_cache = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+claims_revocations = ClaimsRevocations(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.CLAIMS_TTL_SECONDS,
+)
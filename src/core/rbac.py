@@ -0,0 +1,44 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.database.models import Permission, Role
+from src.services.utils import logger
+from threading import Lock
+from typing import Iterable
+
+# interns names to stable bit positions for the lifetime of the process
+class BitRegistry:
+    def __init__(self):
+        self._bits: dict[str, int] = {}
+        self._lock = Lock()
+
+    def bit(self, name: str) -> int:
+        bit = self._bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.setdefault(name, 1 << len(self._bits))
+        return bit
+
+    def mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.bit(name)
+        return mask
+
+    def names(self, mask: int) -> frozenset[str]:
+        return frozenset(name for name, bit in self._bits.items() if mask & bit)
+
+role_bits = BitRegistry()
+permission_bits = BitRegistry()
+
+async def load_rbac_bits(db: AsyncSession):
+    # names missing here are still interned lazily on first use
+    try:
+        roles = await db.execute(select(Role.name).order_by(Role.id))
+        permissions = await db.execute(select(Permission.name).order_by(Permission.id))
+    except SQLAlchemyError as e:
+        logger.warning("Could not preload RBAC bits: %s", e)
+        return
+
+    role_bits.mask(roles.scalars())
+    permission_bits.mask(permissions.scalars())
@@ -0,0 +1,161 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.conf.config import settings
+from src.services.utils import logger
+from starlette.datastructures import MutableHeaders
+from threading import Lock
+from time import perf_counter
+
+# What one request cost: wall time, SQL statements, time spent in the driver
+# and rows returned or affected. Filled by the engine hooks below through a
+# context variable, so repositories need no changes.
+
+@dataclass(slots=True)
+class RequestStats:
+    started: float = field(default_factory=perf_counter)
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    slow: list[tuple[float, str]] = field(default_factory=list)
+
+    def server_timing(self) -> str:
+        total_ms = (perf_counter() - self.started) * 1000
+        return (
+            f"total;dur={total_ms:.1f}, "
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} statements, {self.rows} rows"'
+        )
+
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+def _log_slow_statements(label: str, slow: list[tuple[float, str]]) -> None:
+    slowest = sorted(slow, key=lambda item: item[0], reverse=True)[:settings.SLOW_QUERY_LOG_LIMIT]
+    logger.warning(
+        "Slow statements during %s: %s",
+        label,
+        "; ".join(f"{seconds * 1000:.1f} ms {statement[:500]}" for seconds, statement in slowest)
+    )
+
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["query_started"].pop()
+        stats = current_request_stats.get()
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+
+        if threshold is not None and elapsed * 1000 >= threshold:
+            if stats is None:
+                _log_slow_statements("background work", [(elapsed, statement)])
+            else:
+                stats.slow.append((elapsed, statement))
+
+        if stats is None:
+            return
+
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        # asyncpg reports rows for SELECT too, sqlite only for writes
+        if cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# in-process aggregates in the Prometheus text format, labelled by route
+# template rather than raw path so ids do not explode the series count
+class RequestMetrics:
+    def __init__(self):
+        self._lock = Lock()
+        self._durations: dict[tuple[str, str, int], list] = {}
+        self._db: dict[tuple[str, str], list] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        with self._lock:
+            series = self._durations.setdefault(
+                (method, route, status), [[0] * len(DURATION_BUCKETS), 0.0, 0]
+            )
+            bucket = bisect_left(DURATION_BUCKETS, duration)
+            if bucket < len(DURATION_BUCKETS):
+                series[0][bucket] += 1
+            series[1] += duration
+            series[2] += 1
+
+            db = self._db.setdefault((method, route), [0, 0.0, 0])
+            db[0] += stats.statements
+            db[1] += stats.db_seconds
+            db[2] += stats.rows
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Request wall time.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+
+        with self._lock:
+            for (method, route, status), (buckets, total, count) in sorted(self._durations.items()):
+                labels = f'method="{method}",route="{_label(route)}",status="{status}"'
+                cumulative = 0
+                for bound, hits in zip(DURATION_BUCKETS, buckets):
+                    cumulative += hits
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {total}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {count}")
+
+            for name, index, help_text in (
+                ("http_request_db_statements_total", 0, "SQL statements executed."),
+                ("http_request_db_seconds_total", 1, "Time spent executing SQL."),
+                ("http_request_db_rows_total", 2, "Rows returned or affected, as reported by the driver."),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (method, route), values in sorted(self._db.items()):
+                    lines.append(f'{name}{{method="{method}",route="{_label(route)}"}} {values[index]}')
+
+        return "\n".join(lines) + "\n"
+
+request_metrics = RequestMetrics()
+
+# plain ASGI middleware: no extra task per request, and the context variable
+# set here is the one the endpoint and the engine hooks see
+class RequestStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            request_metrics.observe(
+                scope["method"], route_path, status_code, perf_counter() - stats.started, stats
+            )
+
+            if stats.slow:
+                _log_slow_statements(f"{scope['method']} {route_path}", stats.slow)
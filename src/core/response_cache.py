@@ -0,0 +1,155 @@
+from dataclasses import dataclass, field
+from fastapi import Response
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from src.conf.config import settings
+from src.core.cache import LRUCache
+from src.services.utils import logger
+
+import json
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def dump(self) -> bytes:
+        return json.dumps(self.headers).encode() + b"\n" + self.body
+
+    @classmethod
+    def load(cls, raw: bytes) -> "CachedResponse":
+        headers, body = raw.split(b"\n", 1)
+        return cls(body=body, headers=json.loads(headers))
+
+    def as_response(self) -> Response:
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
+
+class MemoryCacheBackend:
+    def __init__(self, maxsize: int):
+        self._cache = LRUCache(maxsize)
+        # generations live outside the LRU so eviction can never reset one
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | int | None:
+        if key in self._counters:
+            return self._counters[key]
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+class NullCacheBackend:
+    async def get(self, key: str) -> None:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        pass
+
+    async def incr(self, key: str) -> int:
+        return 0
+
+    async def close(self) -> None:
+        pass
+
+class RedisCacheBackend:
+    def __init__(self, url: str):
+        self._redis = Redis.from_url(url, socket_timeout=settings.RESPONSE_CACHE_TIMEOUT)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._redis.set(key, value, ex=ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self._redis.incr(key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+# responses are stored under "<prefix>:<namespace>:<generation>:<key>"; a write
+# bumps the namespace generation, so every older entry is skipped at once and
+# left to expire instead of being tracked and deleted one by one
+class ResponseCache:
+    def __init__(self, backend, ttl: int, prefix: str = "photo-share"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:generation"
+
+    async def entry_key(self, namespace: str, key: str) -> str | None:
+        # resolved once per request and reused for the write, so a response
+        # read before an invalidation is never stored under the new generation
+        try:
+            generation = await self.backend.get(self._generation_key(namespace))
+        except RedisError as e:
+            # an unreachable cache degrades to a miss, the database still answers
+            logger.warning("Response cache read failed: %s", e)
+            return None
+
+        return f"{self.prefix}:{namespace}:{int(generation or 0)}:{key}"
+
+    async def get(self, entry_key: str | None) -> CachedResponse | None:
+        if entry_key is None:
+            return None
+
+        try:
+            raw = await self.backend.get(entry_key)
+        except RedisError as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+
+        return CachedResponse.load(raw) if raw is not None else None
+
+    async def set(self, entry_key: str | None, response: CachedResponse) -> None:
+        if entry_key is None:
+            return
+
+        try:
+            await self.backend.set(entry_key, response.dump(), self.ttl)
+        except RedisError as e:
+            logger.warning("Response cache write failed: %s", e)
+
+    async def invalidate(self, namespace: str) -> None:
+        try:
+            await self.backend.incr(self._generation_key(namespace))
+        except RedisError as e:
+            logger.error("Response cache invalidation failed: %s", e)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+def build_response_cache() -> ResponseCache:
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        backend = RedisCacheBackend(settings.RESPONSE_CACHE_URL)
+    elif settings.RESPONSE_CACHE_BACKEND == "memory" and settings.WEB_CONCURRENCY > 1:
+        # invalidations would not reach the other workers
+        logger.warning(
+            "In-memory response cache disabled with %d workers, use the redis backend",
+            settings.WEB_CONCURRENCY
+        )
+        backend = NullCacheBackend()
+    elif settings.RESPONSE_CACHE_BACKEND == "memory":
+        backend = MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_SIZE)
+    else:
+        backend = NullCacheBackend()
+
+    return ResponseCache(backend, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+response_cache = build_response_cache()
+
+POSTS_NAMESPACE = "posts"
+
+async def invalidate_posts() -> None:
+    # feed pages and post details embed author and rating data, so any write
+    # that touches a post, its ratings or its author retires the whole namespace
+    await response_cache.invalidate(POSTS_NAMESPACE)
@@ -1,33 +1,158 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from calendar import timegm
 from datetime import datetime, timedelta
+from hashlib import sha256
 from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
 from passlib.context import CryptContext
 from src.conf.config import settings
-from typing import Any
-from uuid import UUID
+from src.core.cache import LRUCache
+from src.core.workers import BoundedWorkerPool
+from time import time
+from typing import Any, Protocol
+from uuid import UUID, uuid4
+
+import binascii, hmac, json
+
+# encodes and verifies signed tokens; decode raises jose's ExpiredSignatureError
+# or JWTError, whichever implementation is plugged in
+class TokenCodec(Protocol):
+    def encode(self, claims: dict[str, Any], key: str) -> str: ...
+
+    def decode(self, token: str, key: str) -> dict[str, Any]: ...
+
+class JoseCodec:
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict[str, Any], key: str) -> str:
+        return jwt.encode(claims, key, algorithm=self.algorithm)
+
+    def decode(self, token: str, key: str) -> dict[str, Any]:
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+def _b64encode(data: bytes) -> bytes:
+    return urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64decode(data: bytes) -> bytes:
+    return urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+# HS256 on the standard library only: one HMAC, one compare_digest and one
+# json parse per token. Tokens are interchangeable with python-jose's.
+class HS256Codec:
+    HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+    def encode(self, claims: dict[str, Any], key: str) -> str:
+        claims = {
+            name: timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+            for name, value in claims.items()
+        }
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = self.HEADER + b"." + payload
+        signature = hmac.new(key.encode(), signing_input, sha256).digest()
+
+        return (signing_input + b"." + _b64encode(signature)).decode()
+
+    def decode(self, token: str, key: str) -> dict[str, Any]:
+        try:
+            signing_input, signature = token.encode().rsplit(b".", 1)
+            header, payload = signing_input.split(b".")
+
+            # the fixed header is recognised without parsing it
+            if header != self.HEADER:
+                header_json = json.loads(_b64decode(header))
+                if not isinstance(header_json, dict):
+                    raise JWTError("Invalid header")
+                if header_json.get("alg") != "HS256":
+                    raise JWTError("The specified alg value is not allowed")
+
+            expected = hmac.new(key.encode(), signing_input, sha256).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                raise JWTError("Signature verification failed.")
+
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, binascii.Error, UnicodeError) as e:
+            raise JWTError(f"Invalid token: {e}")
+
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload")
+
+        now = time()
+        for name in ("exp", "nbf"):
+            if name in claims and not isinstance(claims[name], (int, float)):
+                raise JWTError(f"Invalid {name} claim")
+        if "exp" in claims and claims["exp"] <= now:
+            raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in claims and claims["nbf"] > now:
+            raise JWTError("The token is not yet valid (nbf)")
+
+        return claims
+
+def build_token_codec() -> TokenCodec:
+    if settings.TOKEN_CODEC == "hs256":
+        return HS256Codec()
+    return JoseCodec(settings.ALGORITHM)
 
 class Security:
-    def __init__(self, schemes=["bcrypt"]):
+    def __init__(self, schemes=["bcrypt"], codec: TokenCodec | None = None):
         self.pwd_context = CryptContext(schemes=schemes, deprecated="auto")
+        self.codec = codec or build_token_codec()
+        # a client sends one access token many times; verified claims are kept
+        # under the token's digest until the token expires
+        self.decoded_tokens = LRUCache(maxsize=settings.TOKEN_DECODE_CACHE_MAX_SIZE)
+        # bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+        self.hashing_pool = BoundedWorkerPool(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+            name="password-hash",
+        )
 
     def create_token(
             self,
             token_type: str,
-            subject: str | Any
+            subject: str | Any,
+            claims: dict[str, Any] | None = None
     ) -> str:
+        claims = dict(claims or {})
+
         if token_type == 'access':
-            expiration = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+            expiration = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
             secret_key = settings.SECRET_KEY
         elif token_type == 'refresh':
-            expiration = settings.REFRESH_TOKEN_EXPIRE_DAYS
+            expiration = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
             secret_key = settings.REFRESH_SECRET_KEY
+            # refresh tokens are stored by hash, jti keeps two issued in the
+            # same second apart
+            claims["jti"] = uuid4().hex
 
-        expire = datetime.now() + timedelta(minutes=expiration)
-        to_encode = {"exp": expire, "sub": str(subject)}
-        encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=settings.ALGORITHM)
+        expire = datetime.now() + expiration
+        to_encode = {**claims, "exp": expire, "sub": str(subject)}
+        encoded_jwt = self.codec.encode(to_encode, secret_key)
         return encoded_jwt
 
-    def generate_tokens(self, user_id: UUID) -> dict[str, str]:
-        access_token = self.create_token('access', user_id)
+    def decode_access_token(self, token: str) -> dict[str, Any]:
+        # the returned claims are shared between requests and must not be mutated
+        digest = sha256(token.encode()).digest()
+        claims = self.decoded_tokens.get(digest)
+        if claims is not None:
+            return claims
+
+        claims = self.codec.decode(token.strip().replace('"', ""), settings.SECRET_KEY)
+
+        # the entry expires with the token, an expired token is decoded again and rejected
+        exp = claims.get("exp")
+        if exp is not None:
+            self.decoded_tokens.set(digest, claims, ttl=exp - time())
+
+        return claims
+
+    def decode_refresh_token(self, token: str) -> dict[str, Any]:
+        # used once per refresh, not worth caching
+        return self.codec.decode(token, settings.REFRESH_SECRET_KEY)
+
+    def generate_tokens(self, user_id: UUID, claims: dict[str, Any] | None = None) -> dict[str, str]:
+        # claims only ride on the access token, the refresh token stays opaque
+        access_token = self.create_token('access', user_id, claims)
         refresh_token = self.create_token('refresh', user_id)
         return {
             "access_token": access_token, 
@@ -35,10 +160,21 @@ class Security:
             "refresh_token": refresh_token
         }    
 
+    def hash_token(self, token: str) -> str:
+        # refresh tokens are long and random, a fast hash is enough to keep
+        # them unusable if the table leaks
+        return sha256(token.encode()).hexdigest()
+
     def get_password_hash(self, password: str) -> str:
         return self.pwd_context.hash(password)
     
     def verify_password(self, plain_password: str, password: str) -> bool:
         return self.pwd_context.verify(plain_password, password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        return await self.hashing_pool.run(self.get_password_hash, password)
+
+    async def verify_password_async(self, plain_password: str, password: str) -> bool:
+        return await self.hashing_pool.run(self.verify_password, plain_password, password)
     
 security = Security()
\ No newline at end of file
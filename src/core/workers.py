@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from functools import partial
+from typing import Any, Callable
+
+import asyncio
+
+# runs blocking calls off the event loop on a fixed number of threads and
+# sheds load once too many calls are waiting for a worker
+class BoundedWorkerPool:
+    def __init__(self, max_workers: int, max_pending: int, name: str):
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        # pending is only touched from the event loop thread
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
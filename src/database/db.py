@@ -1,21 +1,116 @@
 from src.conf.config import settings
+from src.core.request_stats import instrument_engine
 from src.services.utils import logger
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 import contextlib
+import time
+
+def engine_options(url: str) -> dict:
+    url = make_url(url)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    # sqlite uses its own single-file pools that take no sizing arguments
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+        }
+
+    return options
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+# Pool wait is timed around the checkout the session makes for its first real
+# statement: the clock starts when a session without a connection asks for its
+# bind and stops in after_begin, once the pool handed one out. Sessions that
+# never send SQL never check out a connection.
+class PoolWaitSession(Session):
+    def get_bind(self, *args, **kwargs):
+        if "pool_metrics" in self.info and not self.info.get("connected"):
+            self.info.setdefault("checkout_started", time.perf_counter())
+        return super().get_bind(*args, **kwargs)
+
+@event.listens_for(PoolWaitSession, "after_begin")
+def _connection_checked_out(session, transaction, connection):
+    started = session.info.pop("checkout_started", None)
+    session.info["connected"] = True
+    if started is not None:
+        session.info["pool_metrics"].record_wait(time.perf_counter() - started)
+
+@event.listens_for(PoolWaitSession, "after_transaction_end")
+def _connection_released(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("connected", None)
 
 class DatabaseSessionManager:
     def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+        self._engine: AsyncEngine | None = create_async_engine(url, **engine_options(url))
+        instrument_engine(self._engine.sync_engine)
+        self.metrics = PoolMetrics()
         self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
+            autoflush=False, autocommit=False, bind=self._engine,
+            sync_session_class=PoolWaitSession, info={"pool_metrics": self.metrics}
         )
 
+    async def warm_up(self, connections: int = settings.DB_POOL_SIZE):
+        # open the pool's base connections before the first request needs them
+        opened = []
+        try:
+            for _ in range(connections):
+                conn = await self._engine.connect()
+                opened.append(conn)
+                await conn.execute(text("SELECT 1"))
+        except SQLAlchemyError as e:
+            logger.warning("Database pool warm-up stopped after %d connections: %s", len(opened), e)
+        finally:
+            for conn in opened:
+                await conn.close()
+
+    async def close(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+
+    def pool_status(self) -> dict:
+        pool = self._engine.pool
+        status = {
+            "pool_class": type(pool).__name__,
+            "checkouts": self.metrics.checkouts,
+            "wait_seconds_total": round(self.metrics.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.metrics.wait_seconds_max, 6),
+        }
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            if hasattr(pool, name):
+                status[name] = getattr(pool, name)()
+        return status
+
     @contextlib.asynccontextmanager
     async def session(self):
         if self._session_maker is None:
@@ -24,11 +119,11 @@ class DatabaseSessionManager:
         try:
             yield session
         except SQLAlchemyError as e:
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             await session.rollback()
             raise
         except Exception as e:
-            logger.error(f"Unexpected error: {e}", exc_info=True)
+            logger.error("Unexpected error: %s", e, exc_info=True)
             await session.rollback()
             raise
         finally:
@@ -40,3 +135,7 @@ sessionmanager = DatabaseSessionManager(settings.DB_URL)
 async def get_db():
     async with sessionmanager.session() as session:
         yield session
+
+def get_session_factory():
+    # for handlers that only open a session on a cache miss
+    return sessionmanager.session
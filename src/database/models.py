@@ -1,7 +1,11 @@
 from datetime import datetime
 from uuid import uuid4, UUID
-from sqlalchemy import Column, DateTime, Enum, Integer, String, Table, ForeignKey
+from sqlalchemy import (
+    DDL, Column, DateTime, Enum, Index, Integer, String, Table, ForeignKey, event, func, inspect, select, update
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship, declarative_base, Mapped, mapped_column
+from sqlalchemy.orm.base import NO_VALUE
 
 import enum
 
@@ -38,6 +42,8 @@ class User(Base):
     status: Mapped[bool] = mapped_column(Enum(UserStatusEnum), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
+    # bumped to revoke every access token issued before, see ClaimsRevocations
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     roles = relationship('Role', secondary=user_roles, back_populates='users', lazy="selectin")
     posts: Mapped[list["Post"]] = relationship("Post", back_populates="user")
@@ -69,12 +75,25 @@ class Post(Base):
     image_url: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # title, tag names and description, maintained by the triggers in POST_SEARCH_DDL;
+    # deferred so ordinary post loads never carry it
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR().with_variant(String, "sqlite"), nullable=True, deferred=True
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="posts")
     comments: Mapped[list["Comment"]] = relationship("Comment", back_populates="post")
     tags: Mapped[list["PostTag"]] = relationship("PostTag", back_populates="post")
     ratings: Mapped[list["PostRating"]] = relationship("PostRating", back_populates="post")
 
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_user_id", "user_id"),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
 class Comment(Base):
     __tablename__ = "comments"
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
@@ -87,6 +106,11 @@ class Comment(Base):
     user: Mapped["User"] = relationship("User", back_populates="comments")
     post: Mapped["Post"] = relationship("Post", back_populates="comments")
 
+    __table_args__ = (
+        Index("ix_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+        Index("ix_comments_user_id", "user_id"),
+    )
+
 class PostRating(Base):
     __tablename__ = "post_ratings"
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
@@ -97,32 +121,222 @@ class PostRating(Base):
     user: Mapped["User"] = relationship("User", back_populates="ratings")
     post: Mapped["Post"] = relationship("Post", back_populates="ratings")
 
+    __table_args__ = (
+        Index("uq_post_ratings_user_id_post_id", "user_id", "post_id", unique=True),
+        Index("ix_post_ratings_post_id", "post_id"),
+    )
+
 class PostTag(Base):
     __tablename__ = "post_tags"
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     post_id: Mapped[UUID] = mapped_column(ForeignKey("posts.id", ondelete="CASCADE"))
     tag_name: Mapped[str] = mapped_column(ForeignKey("tags.name", ondelete="CASCADE"))
+    # copy of posts.created_at, so a tag page is ordered straight off the index
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
     post: Mapped["Post"] = relationship("Post", back_populates="tags")
     tag: Mapped["Tag"] = relationship("Tag", back_populates="post_tags")
 
+    __table_args__ = (
+        Index("ix_post_tags_post_id", "post_id"),
+        Index("ix_post_tags_tag_name_post_id", "tag_name", "post_id"),
+        Index("ix_post_tags_tag_name_created_at_post_id", "tag_name", "created_at", "post_id"),
+    )
+
 class Tag(Base):
     __tablename__ = "tags"
     name: Mapped[str] = mapped_column(String, primary_key=True)
+    post_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     post_tags: Mapped[list["PostTag"]] = relationship("PostTag", back_populates="tag")
 
+    __table_args__ = (
+        # prefix autocomplete (LIKE 'abc%') and trigram matching on postgres
+        Index("ix_tags_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tags_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # sha256 of the token, never the token itself
     token: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    # every token rotated from one login shares the family, reuse revokes all of it
+    family_id: Mapped[UUID] = mapped_column(nullable=False, default=uuid4)
     revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now())
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     
     user: Mapped["User"] = relationship("User", back_populates="refresh_tokens")
 
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
+
     @property
     def is_revoked(self) -> bool:
         return self.revoked_at is not None
+
+# Rating counters on posts are kept in step with post_ratings inside the same
+# flush, using relative updates so concurrent writers never overwrite each other.
+def recount_post_ratings_stmt(post_id: UUID | None = None):
+    stmt = update(Post).values(
+        rating_sum=select(func.coalesce(func.sum(PostRating.rating), 0))
+            .where(PostRating.post_id == Post.id)
+            .scalar_subquery(),
+        rating_count=select(func.count(PostRating.id))
+            .where(PostRating.post_id == Post.id)
+            .scalar_subquery(),
+    )
+    if post_id is not None:
+        stmt = stmt.where(Post.id == post_id)
+    return stmt
+
+def _shift_post_rating(connection, post_id: UUID, rating_delta: int, count_delta: int):
+    connection.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(
+            rating_sum=Post.rating_sum + rating_delta,
+            rating_count=Post.rating_count + count_delta,
+        )
+    )
+
+@event.listens_for(PostRating, "after_insert")
+def _post_rating_inserted(mapper, connection, target):
+    _shift_post_rating(connection, target.post_id, target.rating, 1)
+
+@event.listens_for(PostRating, "after_update")
+def _post_rating_updated(mapper, connection, target):
+    state = inspect(target)
+    rating_history = state.attrs.rating.history
+    post_history = state.attrs.post_id.history
+
+    if not rating_history.has_changes() and not post_history.has_changes():
+        return
+
+    # the previous value is only known if it was loaded before the change
+    if post_history.has_changes() or not rating_history.deleted:
+        for post_id in {*post_history.deleted, target.post_id}:
+            connection.execute(recount_post_ratings_stmt(post_id))
+        return
+
+    _shift_post_rating(connection, target.post_id, target.rating - rating_history.deleted[0], 0)
+
+@event.listens_for(PostRating, "after_delete")
+def _post_rating_deleted(mapper, connection, target):
+    rating = inspect(target).attrs.rating.loaded_value
+
+    if rating is NO_VALUE:
+        connection.execute(recount_post_ratings_stmt(target.post_id))
+        return
+
+    _shift_post_rating(connection, target.post_id, -rating, -1)
+
+# Full-text search document for posts on PostgreSQL. The posts trigger covers
+# title/description writes; the post_tags triggers are statement level, so a
+# multi-row tag insert refreshes each post once.
+POST_SEARCH_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION post_search_vector(uuid, text, text) RETURNS tsvector
+    LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('english', coalesce($2, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(
+                (SELECT string_agg(tag_name, ' ') FROM post_tags WHERE post_tags.post_id = $1), ''
+            )), 'B')
+            || setweight(to_tsvector('english', coalesce($3, '')), 'C')
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION posts_search_vector_refresh() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := post_search_vector(NEW.id, NEW.title, NEW.description);
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION post_tags_search_vector_refresh() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE posts SET search_vector = post_search_vector(posts.id, posts.title, posts.description)
+        WHERE posts.id IN (SELECT DISTINCT post_id FROM changed_tags);
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER posts_search_vector_refresh
+    BEFORE INSERT OR UPDATE OF title, description ON posts
+    FOR EACH ROW EXECUTE FUNCTION posts_search_vector_refresh()
+    """,
+    """
+    CREATE TRIGGER post_tags_search_vector_insert
+    AFTER INSERT ON post_tags REFERENCING NEW TABLE AS changed_tags
+    FOR EACH STATEMENT EXECUTE FUNCTION post_tags_search_vector_refresh()
+    """,
+    """
+    CREATE TRIGGER post_tags_search_vector_delete
+    AFTER DELETE ON post_tags REFERENCING OLD TABLE AS changed_tags
+    FOR EACH STATEMENT EXECUTE FUNCTION post_tags_search_vector_refresh()
+    """,
+)
+
+# the triggers reference both tables, so they are created once post_tags exists
+for statement in POST_SEARCH_DDL:
+    event.listen(PostTag.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+# tags.post_count follows every post_tags write, including rows removed by
+# ON DELETE CASCADE when a post or its author is deleted. PostgreSQL shifts
+# each tag once per statement, SQLite has row level triggers only.
+TAG_COUNT_DDL = {
+    "postgresql": (
+        """
+        CREATE OR REPLACE FUNCTION post_tags_count_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE tags SET post_count = tags.post_count
+                + CASE TG_OP WHEN 'INSERT' THEN changed.links ELSE -changed.links END
+            FROM (SELECT tag_name, COUNT(*) AS links FROM changed_tags GROUP BY tag_name) changed
+            WHERE tags.name = changed.tag_name;
+            RETURN NULL;
+        END
+        $$
+        """,
+        """
+        CREATE TRIGGER post_tags_count_insert
+        AFTER INSERT ON post_tags REFERENCING NEW TABLE AS changed_tags
+        FOR EACH STATEMENT EXECUTE FUNCTION post_tags_count_refresh()
+        """,
+        """
+        CREATE TRIGGER post_tags_count_delete
+        AFTER DELETE ON post_tags REFERENCING OLD TABLE AS changed_tags
+        FOR EACH STATEMENT EXECUTE FUNCTION post_tags_count_refresh()
+        """,
+    ),
+    "sqlite": (
+        """
+        CREATE TRIGGER post_tags_count_insert AFTER INSERT ON post_tags
+        BEGIN
+            UPDATE tags SET post_count = post_count + 1 WHERE name = NEW.tag_name;
+        END
+        """,
+        """
+        CREATE TRIGGER post_tags_count_delete AFTER DELETE ON post_tags
+        BEGIN
+            UPDATE tags SET post_count = post_count - 1 WHERE name = OLD.tag_name;
+        END
+        """,
+    ),
+}
+
+for dialect, statements in TAG_COUNT_DDL.items():
+    for statement in statements:
+        event.listen(PostTag.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
@@ -26,7 +26,7 @@ class AuthRepository:
         return user.roles
         
     async def create_user(self, user_data: UserCreate, user_role: str):
-        password = security.get_password_hash(user_data.password)
+        password = await security.get_password_hash_async(user_data.password)
         new_user = User(
             username=user_data.username,
             email=user_data.email,
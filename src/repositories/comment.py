@@ -1,6 +1,9 @@
 from datetime import datetime
 from src.database.models import Comment
+from src.repositories.projections import comment_from_row, comment_select, comment_version_select
+from src.schemas.comment import CommentResponse
 from uuid import UUID
+from sqlalchemy import tuple_
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 from sqlalchemy.sql.expression import Delete, Update
@@ -29,14 +32,40 @@ class CommentRepository:
 
         return result.scalar_one_or_none()
 
-    async def get_comments(self, post_id) -> list[Comment]:
-        stmt = (select(Comment).join(Comment.post)
-            .where(Comment.post_id == post_id).order_by(Comment.created_at.desc())
-            .options(joinedload(Comment.user))
+    def _page(self, stmt, post_id, limit: int | None, before: tuple[datetime, UUID] | None):
+        stmt = (stmt
+            .where(Comment.post_id == post_id)
+            .order_by(Comment.created_at.desc(), Comment.id.desc())
         )
-        result = await self.db.execute(stmt)
 
-        return result.scalars().all()
+        # keyset pagination over (created_at, id), served by ix_comments_post_id_created_at_id
+        if before is not None:
+            stmt = stmt.where(tuple_(Comment.created_at, Comment.id) < before)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return stmt
+
+    async def get_comments(
+            self,
+            post_id,
+            limit: int | None = None,
+            before: tuple[datetime, UUID] | None = None
+        ) -> list[CommentResponse]:
+        result = await self.db.execute(self._page(comment_select(), post_id, limit, before))
+
+        return [comment_from_row(row) for row in result.mappings().all()]
+
+    async def get_comments_version(
+            self,
+            post_id,
+            limit: int | None = None,
+            before: tuple[datetime, UUID] | None = None
+        ) -> list[tuple]:
+        result = await self.db.execute(self._page(comment_version_select(), post_id, limit, before))
+
+        return result.all()
     
     async def get_comment(self, comment_id: UUID) -> Comment | None:
         result = await self.db.execute(
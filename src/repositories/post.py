@@ -1,11 +1,17 @@
 from datetime import datetime
 from fastapi import HTTPException
-from src.database.models import Post, PostTag, Tag, User
+from src.core.principal import Principal
+from src.core.response_cache import invalidate_posts
+from src.database.models import Post, PostTag, Tag
+from src.repositories.projections import (
+    fetch_posts, load_post_tags, post_from_row, post_returning_columns, post_select, post_version_select
+)
 from src.schemas.post import PostCreateModel, PostCreateResponse, PostResponse
-from src.schemas.tag import TagsShortResponse
+from sqlalchemy import exists, func, insert, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.sql.expression import Delete, Update
 from uuid import UUID
 
@@ -16,7 +22,7 @@ class PostRepository:
     async def create(
             self, 
             post_data: PostCreateModel,
-            user: User
+            user: Principal
         ) -> Post:
 
         post = Post(
@@ -31,120 +37,181 @@ class PostRepository:
         self.db.add(post)
         await self.db.flush()
 
-        tag_names = post_data.tags
+        # duplicates are dropped up front so the post gets each tag once
+        tag_names = list(dict.fromkeys(tag.name for tag in post_data.tags or []))
 
-        for tag_model in tag_names:
-            stmt = select(Tag).where(Tag.name == tag_model.name)
-            result = await self.db.execute(stmt)
-            tag = result.scalar_one_or_none()
-
-            if not tag:
-                tag = Tag(name=tag_model.name)
-                self.db.add(tag)
-                await self.db.flush()
-
-            stmt = select(PostTag).where(
-                PostTag.post_id == post.id, 
-                PostTag.tag_name == tag_model.name
+        if tag_names:
+            # one multi-row statement each, whatever the number of tags
+            await self.db.execute(
+                self._insert_ignoring_conflicts(Tag)
+                .values([{"name": name} for name in tag_names])
+            )
+            await self.db.execute(
+                insert(PostTag)
+                .values([
+                    {"post_id": post.id, "tag_name": name, "created_at": post.created_at}
+                    for name in tag_names
+                ])
             )
-            result = await self.db.execute(stmt)
-            post_tag_exists = result.scalar_one_or_none()
-
-            if not post_tag_exists:
-                post_tag = PostTag(post_id=post.id, tag_name=tag_model.name)
-                self.db.add(post_tag)
-                
-            await self.db.commit()
-            await self.db.refresh(post)
+
+        # built before commit so the expired instance is not reloaded
         post_response = PostCreateResponse.model_validate(post)
+        await self.db.commit()
+        await invalidate_posts()
 
         return post_response
-    
-    async def delete_post(self, post_id: UUID) -> bool:
-        stmt = Delete(Post).where(Post.id == post_id)
-        result = await self.db.execute(stmt)
-        await self.db.commit()
 
-        return result.rowcount > 0
+    def _insert_ignoring_conflicts(self, model):
+        # INSERT ... ON CONFLICT DO NOTHING, spelled for the bound dialect
+        if self.db.get_bind().dialect.name == "postgresql":
+            return postgresql_insert(model).on_conflict_do_nothing()
+
+        return sqlite_insert(model).on_conflict_do_nothing()
     
-    async def get_post(self, post_id: UUID) -> Post:
-        stmt = (
-            select(Post)
-            .options(
-                joinedload(Post.user),
-                selectinload(Post.tags).selectinload(PostTag.tag),
-                selectinload(Post.ratings)
-            )
-            .where(Post.id == post_id)
+    async def delete_post(self, post_id: UUID, owner_id: UUID | None = None) -> bool:
+        # owner_id limits the delete to the author's own post, elevated callers pass None;
+        # tag links go first under the same condition, so the tag count triggers
+        # fire even where foreign keys do not cascade (SQLite without the pragma)
+        await self.db.execute(
+            Delete(PostTag)
+            .where(PostTag.post_id.in_(select(Post.id).where(self._writable(post_id, owner_id))))
+            .execution_options(synchronize_session=False)
         )
 
+        stmt = (
+            Delete(Post)
+            .where(self._writable(post_id, owner_id))
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
+        )
         result = await self.db.execute(stmt)
 
-        post = result.scalar_one_or_none()
+        if result.first() is None:
+            if owner_id is None:
+                return False
+            await self._raise_write_denied(post_id, "delete")
 
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found")
-        
-        post_response = PostResponse.model_validate(post)
-        
-        post_response.avg_rating = (
-            round(sum(r.rating for r in post.ratings) / len(post.ratings), 2)
-            if post.ratings else None
-        )
-        post_response.rating_count = len(post.ratings)
+        await self.db.commit()
+        await invalidate_posts()
 
-        post_response.tags = []
-        post_response.tags = [
-            TagsShortResponse.model_validate(tag_rel.tag)
-            for tag_rel in post.tags
-            if tag_rel.tag is not None
-        ]
+        return True
 
-        return post_response
+    def _writable(self, post_id: UUID, owner_id: UUID | None):
+        if owner_id is None:
+            return Post.id == post_id
+        return (Post.id == post_id) & (Post.user_id == owner_id)
+
+    async def _raise_write_denied(self, post_id: UUID, access_type: str):
+        # only reached when the conditional write matched nothing
+        exists = await self.db.scalar(select(Post.id).where(Post.id == post_id))
+
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        raise HTTPException(status_code=403, detail=f"You cannot {access_type} this post")
     
-    async def update_post(self, post_id: UUID, description: str) -> Post:
-        stmt = Update(Post).where(Post.id == post_id).values(
-            description=description,
-            updated_at = datetime.now()
-        )
-        await self.db.execute(stmt)
-        await self.db.commit()
+    async def get_post(self, post_id: UUID) -> PostResponse:
+        posts = await fetch_posts(self.db, post_select().where(Post.id == post_id))
 
-        post = await self.get_post(post_id)
+        if not posts:
+            raise HTTPException(status_code=404, detail="Post not found")
 
-        return post
+        return posts[0]
     
-    async def get_posts(self) -> list[Post]:
-        stmt = (select(
-            Post
-        ).join(Post.user)
-        .options(
-            joinedload(Post.user),
-            selectinload(Post.tags).selectinload(PostTag.tag),
-            selectinload(Post.ratings)
-        ).order_by(Post.created_at.desc())
+    async def update_post(
+            self,
+            post_id: UUID,
+            description: str,
+            owner_id: UUID | None = None
+        ) -> PostResponse:
+        # authorization and mutation in one statement, the row comes back with it
+        stmt = (
+            Update(Post)
+            .where(self._writable(post_id, owner_id))
+            .values(
+                description=description,
+                updated_at = datetime.now()
+            )
+            .returning(*post_returning_columns())
+            .execution_options(synchronize_session=False)
         )
+        row = (await self.db.execute(stmt)).mappings().first()
 
-        result = await self.db.execute(stmt)
+        if row is None:
+            await self._raise_write_denied(post_id, "update")
+
+        await self.db.commit()
+        await invalidate_posts()
+
+        tags = await load_post_tags(self.db, [row["id"]])
 
-        posts = result.scalars().all()
+        return post_from_row(row, tags[row["id"]])
     
-        posts_response = []
+    async def get_post_version(self, post_id: UUID) -> list[tuple]:
+        result = await self.db.execute(post_version_select().where(Post.id == post_id))
+        rows = result.all()
 
-        for post in posts:
-            avg = round(sum(r.rating for r in post.ratings) / len(post.ratings), 2) if post.ratings else None
-            count = len(post.ratings)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Post not found")
 
-            post_response = PostResponse.model_validate(post)
-            post_response.avg_rating = avg
-            post_response.rating_count = count
+        return rows
+
+    def _page(self, stmt, limit: int | None, after: tuple[datetime, UUID] | None):
+        stmt = stmt.order_by(Post.created_at.desc(), Post.id.desc())
+
+        # keyset pagination over (created_at, id), served by ix_posts_created_at_id
+        if after is not None:
+            stmt = stmt.where(tuple_(Post.created_at, Post.id) < after)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return stmt
+
+    async def get_posts(
+            self,
+            limit: int | None = None,
+            after: tuple[datetime, UUID] | None = None
+        ) -> list[PostResponse]:
+        return await fetch_posts(self.db, self._page(post_select(), limit, after))
+
+    async def get_posts_version(
+            self,
+            limit: int | None = None,
+            after: tuple[datetime, UUID] | None = None
+        ) -> list[tuple]:
+        result = await self.db.execute(self._page(post_version_select(), limit, after))
+
+        return result.all()
+
+    def _search(self, query: str):
+        if self.db.get_bind().dialect.name == "postgresql":
+            # matched through ix_posts_search_vector, best ranked first
+            tsquery = func.websearch_to_tsquery("english", query)
+            return (
+                post_select()
+                .where(Post.search_vector.bool_op("@@")(tsquery))
+                .order_by(
+                    func.ts_rank_cd(Post.search_vector, tsquery).desc(),
+                    Post.created_at.desc(),
+                    Post.id.desc()
+                )
+            )
 
-            post_response.tags = [
-            TagsShortResponse.model_validate(tag_rel.tag)
-                for tag_rel in post.tags
-                if tag_rel.tag is not None
-            ]
+        # SQLite has no search document, every term has to appear in the title,
+        # the description or one of the tag names
+        def matches(term):
+            return or_(
+                Post.title.icontains(term, autoescape=True),
+                Post.description.icontains(term, autoescape=True),
+                exists().where(PostTag.post_id == Post.id, PostTag.tag_name.icontains(term, autoescape=True))
+            )
 
-            posts_response.append(post_response)
+        return (
+            post_select()
+            .where(*[matches(term) for term in query.split()])
+            .order_by(Post.created_at.desc(), Post.id.desc())
+        )
 
-        return posts_response
+    async def search_posts(self, query: str, limit: int, offset: int = 0) -> list[PostResponse]:
+        return await fetch_posts(self.db, self._search(query).limit(limit).offset(offset))
@@ -0,0 +1,187 @@
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.database.models import Comment, Post, PostTag, Role, User, user_roles
+from src.schemas.comment import CommentResponse
+from src.schemas.post import PostResponse
+from src.schemas.role import RoleResponse
+from src.schemas.tag import TagsShortResponse
+from src.schemas.user import UserProfileResponse, UserShortResponse
+from uuid import UUID
+
+# read-path queries: only the columns a response schema needs are selected and
+# the rows come back as plain mappings, so nothing lands in the identity map
+# and User.roles (lazy="selectin") is never triggered
+
+def author_columns() -> tuple:
+    return (
+        User.id.label("author_id"),
+        User.username.label("author_username"),
+        User.img_link.label("author_img_link"),
+    )
+
+def author_from_row(row) -> UserShortResponse:
+    return UserShortResponse(
+        id=row["author_id"],
+        username=row["author_username"],
+        img_link=row["author_img_link"]
+    )
+
+def post_columns() -> tuple:
+    return (
+        Post.id,
+        Post.title,
+        Post.user_id,
+        Post.description,
+        Post.image_url,
+        Post.created_at,
+        Post.updated_at,
+        Post.rating_sum,
+        Post.rating_count,
+    )
+
+def post_select() -> Select:
+    return (
+        select(*post_columns(), *author_columns())
+        .join(User, User.id == Post.user_id)
+    )
+
+def post_returning_columns() -> tuple:
+    # UPDATE/DELETE ... RETURNING cannot join, the author comes from scalar subqueries
+    def author(column):
+        return select(column).where(User.id == Post.user_id).scalar_subquery()
+
+    return (
+        *post_columns(),
+        Post.user_id.label("author_id"),
+        author(User.username).label("author_username"),
+        author(User.img_link).label("author_img_link"),
+    )
+
+def post_version_select() -> Select:
+    # everything a rendered post depends on, for ETag / Last-Modified; tags are
+    # only written together with the post, so they are covered by its id
+    return (
+        select(
+            Post.id,
+            Post.updated_at,
+            Post.rating_sum,
+            Post.rating_count,
+            User.updated_at.label("author_updated_at")
+        )
+        .join(User, User.id == Post.user_id)
+    )
+
+def post_from_row(row, tags: list[TagsShortResponse]) -> PostResponse:
+    rating_count = row["rating_count"]
+
+    return PostResponse(
+        id=row["id"],
+        title=row["title"],
+        user_id=row["user_id"],
+        description=row["description"],
+        image_url=row["image_url"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        avg_rating=round(row["rating_sum"] / rating_count, 2) if rating_count else None,
+        rating_count=rating_count,
+        user=author_from_row(row),
+        tags=tags
+    )
+
+async def load_post_tags(db: AsyncSession, post_ids: list[UUID]) -> dict[UUID, list[TagsShortResponse]]:
+    tags = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return tags
+
+    # tag_name is the tags primary key, so the tags table itself is not needed
+    result = await db.execute(
+        select(PostTag.post_id, PostTag.tag_name).where(PostTag.post_id.in_(post_ids))
+    )
+    for post_id, tag_name in result.all():
+        tags[post_id].append(TagsShortResponse(name=tag_name))
+
+    return tags
+
+async def fetch_posts(db: AsyncSession, stmt: Select) -> list[PostResponse]:
+    rows = (await db.execute(stmt)).mappings().all()
+    tags = await load_post_tags(db, [row["id"] for row in rows])
+
+    return [post_from_row(row, tags[row["id"]]) for row in rows]
+
+def comment_select() -> Select:
+    return (
+        select(
+            Comment.id,
+            Comment.user_id,
+            Comment.post_id,
+            Comment.message,
+            Comment.created_at,
+            Comment.updated_at,
+            *author_columns()
+        )
+        .join(User, User.id == Comment.user_id)
+    )
+
+def comment_version_select() -> Select:
+    return (
+        select(
+            Comment.id,
+            Comment.updated_at,
+            User.updated_at.label("author_updated_at")
+        )
+        .join(User, User.id == Comment.user_id)
+    )
+
+def comment_from_row(row) -> CommentResponse:
+    return CommentResponse(
+        id=row["id"],
+        user_id=row["user_id"],
+        post_id=row["post_id"],
+        message=row["message"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        user=author_from_row(row)
+    )
+
+def profile_select() -> Select:
+    post_count_subq = (
+        select(func.count(Post.id))
+        .where(Post.user_id == User.id)
+        .scalar_subquery()
+    )
+
+    comment_count_subq = (
+        select(func.count(Comment.id))
+        .where(Comment.user_id == User.id)
+        .scalar_subquery()
+    )
+
+    return select(
+        User.id,
+        User.username,
+        User.first_name,
+        User.last_name,
+        User.email,
+        User.img_link,
+        User.phone,
+        User.status,
+        User.created_at,
+        post_count_subq.label("posts_count"),
+        comment_count_subq.label("comments_count")
+    )
+
+async def load_user_roles(db: AsyncSession, user_id: UUID) -> list[RoleResponse]:
+    result = await db.execute(
+        select(Role.id, Role.name)
+        .join(user_roles, user_roles.c.role_id == Role.id)
+        .where(user_roles.c.user_id == user_id)
+    )
+
+    return [RoleResponse(id=role_id, name=name) for role_id, name in result.all()]
+
+def profile_from_row(row, roles: list[RoleResponse]) -> UserProfileResponse:
+    data = dict(row)
+    data.pop("id")
+
+    return UserProfileResponse(**data, roles=roles)
@@ -0,0 +1,97 @@
+from fastapi import HTTPException
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql.expression import Update
+from src.core.response_cache import invalidate_posts
+from src.database.models import Post, PostRating
+from src.schemas.rating import RatingResponse
+from uuid import UUID, uuid4
+
+class RatingRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _insert_ignoring_conflict(self, post_id: UUID, user_id: UUID, rating: int):
+        # INSERT ... ON CONFLICT (user_id, post_id) DO NOTHING RETURNING id:
+        # a row back means this call created the rating, nothing back means it
+        # already existed. A concurrent first rate by the same user waits on
+        # the unique index here and then sees the committed row.
+        insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+        return (
+            insert(PostRating)
+            .values(id=uuid4(), user_id=user_id, post_id=post_id, rating=rating)
+            .on_conflict_do_nothing(index_elements=[PostRating.user_id, PostRating.post_id])
+            .returning(PostRating.id)
+        )
+
+    def _previous_rating_stmt(self, post_id: UUID, user_id: UUID):
+        # a statement of its own, so the lock sees the committed row and a
+        # concurrent re-rate by the same user waits for it instead of racing
+        return (
+            select(PostRating.rating)
+            .where(PostRating.user_id == user_id, PostRating.post_id == post_id)
+            .with_for_update()
+        )
+
+    async def _upsert_rating_rows(self, post_id: UUID, user_id: UUID, rating: int):
+        inserted = await self.db.scalar(self._insert_ignoring_conflict(post_id, user_id, rating))
+
+        previous = None
+        if inserted is None:
+            previous = await self.db.scalar(self._previous_rating_stmt(post_id, user_id))
+            await self.db.execute(
+                Update(PostRating)
+                .where(PostRating.user_id == user_id, PostRating.post_id == post_id)
+                .values(rating=rating)
+                .execution_options(synchronize_session=False)
+            )
+
+        # counters shifted by the delta in place, so concurrent raters never
+        # overwrite each other's contribution
+        result = await self.db.execute(
+            Update(Post)
+            .where(Post.id == post_id)
+            .values(
+                rating_sum=Post.rating_sum + rating - (previous or 0),
+                rating_count=Post.rating_count + (1 if inserted is not None else 0)
+            )
+            .returning(Post.rating_sum, Post.rating_count)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+
+        if row is None:
+            return None
+
+        return rating, inserted is not None, row.rating_sum, row.rating_count
+
+    async def upsert_rating(self, post_id: UUID, user_id: UUID, rating: int) -> RatingResponse:
+        # core statements bypass the PostRating mapper events, the counters are
+        # maintained here instead
+        try:
+            row = await self._upsert_rating_rows(post_id, user_id, rating)
+        except IntegrityError:
+            # the foreign key rejected the rating, the post does not exist
+            await self.db.rollback()
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        if row is None:
+            await self.db.rollback()
+            raise HTTPException(status_code=404, detail="Post not found")
+
+        await self.db.commit()
+        await invalidate_posts()
+
+        saved_rating, created, rating_sum, rating_count = row
+
+        return RatingResponse(
+            post_id=post_id,
+            rating=saved_rating,
+            created=created,
+            avg_rating=round(rating_sum / rating_count, 2) if rating_count else None,
+            rating_count=rating_count
+        )
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from src.conf.config import settings
+from src.core.security import security
+from src.database.models import RefreshToken
+from src.services.utils import logger
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql.expression import Delete, Update
+from uuid import UUID, uuid4
+
+class RefreshTokenRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, user_id: UUID, token: str, family_id: UUID | None = None) -> UUID:
+        family_id = family_id or uuid4()
+
+        await self.db.execute(
+            insert(RefreshToken).values(
+                id=uuid4(),
+                user_id=user_id,
+                token=security.hash_token(token),
+                family_id=family_id,
+                created_at=datetime.now(),
+                expires_at=datetime.now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+            )
+        )
+        await self.db.commit()
+
+        return family_id
+
+    async def rotate(self, token: str) -> tuple[UUID, UUID]:
+        # revoking the presented token is the lookup: one indexed UPDATE on the
+        # unique token hash, so two requests can never both rotate it.
+        # The caller commits together with the replacement token.
+        token_hash = security.hash_token(token)
+        now = datetime.now()
+
+        result = await self.db.execute(
+            Update(RefreshToken)
+            .where(
+                RefreshToken.token == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now
+            )
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+
+        if row is not None:
+            return row.user_id, row.family_id
+
+        stored = (await self.db.execute(
+            select(RefreshToken.family_id, RefreshToken.revoked_at)
+            .where(RefreshToken.token == token_hash)
+        )).first()
+
+        if stored is not None and stored.revoked_at is not None:
+            # an already rotated token came back, assume it leaked and end the session
+            await self.revoke_family(stored.family_id)
+            logger.warning("Refresh token reuse detected, family %s revoked", stored.family_id)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token reuse detected"
+            )
+
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+        )
+
+    async def revoke_family(self, family_id: UUID) -> None:
+        await self.db.execute(
+            Update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def purge_expired(self, batch_size: int) -> int:
+        # one bounded batch per transaction, served by ix_refresh_tokens_expires_at;
+        # revoked rows stay until they expire, reuse detection needs them
+        expired = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at <= datetime.now())
+            .limit(batch_size)
+        )
+        result = await self.db.execute(
+            Delete(RefreshToken)
+            .where(RefreshToken.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+        return result.rowcount
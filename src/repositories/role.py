@@ -1,5 +1,6 @@
 from sqlalchemy import insert
 from sqlalchemy.future import select
+from src.core.principal import claims_revocations, principal_cache
 from src.database.models import Permission, Role, role_permissions
 from src.services.utils import logger
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -61,9 +62,10 @@ class RoleRepository:
             role = await self.get_role_by_name(role_name)
         
         if not role:
-            logger.info(f"Error: Could not retrieve role '{role_name}' after creation.")
+            logger.info("Error: Could not retrieve role '%s' after creation.", role_name)
             return
        
+        granted = False
         for permission_name in default_permissions:
             permission_result = await self.db.execute(
                 select(Permission).where(Permission.name == permission_name)
@@ -77,7 +79,10 @@ class RoleRepository:
 
             # Defensive guard
             if not isinstance(role.id, (int, str, UUID)) or not isinstance(permission.id, (int, str, UUID)):
-                logger.error(f"Invalid types — role: {role} ({type(role)}), permission: {permission} ({type(permission)})")
+                logger.error(
+                    "Invalid types — role: %s (%s), permission: %s (%s)",
+                    role, type(role), permission, type(permission)
+                )
                 return
 
 
@@ -93,5 +98,11 @@ class RoleRepository:
                     role_id=role.id, permission_id=permission.id
                 )
                 await self.db.execute(insert_stmt)
+                granted = True
             
         await self.db.commit()
+        # cached principals carry the permission names of their roles
+        principal_cache.clear()
+        # so do signed claims, which are only distrusted when a grant changed
+        if granted:
+            claims_revocations.revoke_all()
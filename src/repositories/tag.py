@@ -0,0 +1,78 @@
+from datetime import datetime
+from src.database.models import Post, PostTag, Tag
+from src.repositories.projections import fetch_posts, post_select
+from src.schemas.post import PostResponse
+from src.schemas.tag import TagResponse
+from sqlalchemy import func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from uuid import UUID
+
+# trigram similarity is unreliable below three characters
+TRIGRAM_MIN_LENGTH = 3
+
+class TagRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def tag_exists(self, name: str) -> bool:
+        return await self.db.scalar(select(Tag.name).where(Tag.name == name)) is not None
+
+    async def get_tag_posts(
+            self,
+            name: str,
+            limit: int | None = None,
+            after: tuple[datetime, UUID] | None = None
+        ) -> list[PostResponse]:
+        # ordered and paged on post_tags' own copy of created_at, so the page is
+        # read straight off ix_post_tags_tag_name_created_at_post_id however
+        # many posts the tag has
+        stmt = (
+            post_select()
+            .join(PostTag, PostTag.post_id == Post.id)
+            .where(PostTag.tag_name == name)
+            .order_by(PostTag.created_at.desc(), PostTag.post_id.desc())
+        )
+
+        if after is not None:
+            stmt = stmt.where(tuple_(PostTag.created_at, PostTag.post_id) < after)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return await fetch_posts(self.db, stmt)
+
+    def _suggestions(self, limit: int):
+        return (
+            select(Tag.name, Tag.post_count)
+            .where(Tag.post_count > 0)
+            .limit(limit)
+        )
+
+    async def suggest_tags(self, query: str, limit: int) -> list[TagResponse]:
+        # prefix matches first, LIKE 'abc%' is served by ix_tags_name_pattern
+        result = await self.db.execute(
+            self._suggestions(limit)
+            .where(Tag.name.startswith(query, autoescape=True))
+            .order_by(Tag.post_count.desc(), Tag.name)
+        )
+        tags = [TagResponse(name=name, post_count=count) for name, count in result.all()]
+
+        # then fuzzy matches through ix_tags_name_trgm, postgres only
+        if (
+            len(tags) < limit
+            and len(query) >= TRIGRAM_MIN_LENGTH
+            and self.db.get_bind().dialect.name == "postgresql"
+        ):
+            stmt = (
+                self._suggestions(limit - len(tags))
+                .where(Tag.name.op("%")(query))
+                .order_by(func.similarity(Tag.name, query).desc(), Tag.post_count.desc())
+            )
+            if tags:
+                stmt = stmt.where(Tag.name.notin_([tag.name for tag in tags]))
+
+            result = await self.db.execute(stmt)
+            tags += [TagResponse(name=name, post_count=count) for name, count in result.all()]
+
+        return tags
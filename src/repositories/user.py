@@ -5,7 +5,10 @@ from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.expression import Update
+from src.core.principal import claims_revocations, principal_cache
+from src.core.response_cache import invalidate_posts
 from src.database.models import Comment, Post, User
+from src.repositories.projections import load_user_roles, profile_from_row, profile_select
 from src.schemas.user import (
     UserAccountResponse, UserProfileResponse, UserUpdateRequest, 
     UserUpdateStatusRequest, UserUpdateStatusResponse
@@ -16,45 +19,17 @@ class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_user_profile_by_username(self, username) -> User:
-        post_count_subq = (
-            select(func.count(Post.id))
-            .where(Post.user_id == User.id)
-            .scalar_subquery()
-        )
-
-        comment_count_subq = (
-            select(func.count(Comment.id))
-            .where(Comment.user_id == User.id)
-            .scalar_subquery()
-        )
-
-        stmt = (
-            select(
-                User,
-                post_count_subq.label("posts_count"),
-                comment_count_subq.label("comments_count")
-            )
-            .options(selectinload(User.roles))
-            .where(User.username == username)
-        )
-
-        result = await self.db.execute(stmt)
+    async def get_user_profile_by_username(self, username) -> UserProfileResponse:
+        result = await self.db.execute(profile_select().where(User.username == username))
 
-        row = result.first()
+        row = result.mappings().first()
 
         if not row:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        user, posts_count, comments_count = row
 
-        data = {
-            **user.__dict__,
-            "posts_count": posts_count,
-            "comments_count": comments_count,
-        }
+        roles = await load_user_roles(self.db, row["id"])
 
-        return UserProfileResponse(**data)
+        return profile_from_row(row, roles)
     
     async def get_user_account(self, user_id: UUID) -> UserAccountResponse:
         stmt = (select(User).where(User.id == user_id))
@@ -81,19 +56,32 @@ class UserRepository:
 
         await self.db.execute(stmt)
         await self.db.commit()
+        principal_cache.invalidate(account_id)
+        # posts embed the author's username and avatar
+        await invalidate_posts()
 
         account = await self.get_user_account(account_id)
 
         return account
     
     async def update_user_status(self, account_id: UUID, data: UserUpdateStatusRequest) -> User:
-        stmt = Update(User).where(User.id == account_id).values(
-            status=data.status,
-            updated_at = datetime.now()
+        # a status change revokes every access token issued so far
+        stmt = (
+            Update(User)
+            .where(User.id == account_id)
+            .values(
+                status=data.status,
+                token_version=User.token_version + 1,
+                updated_at = datetime.now()
+            )
+            .returning(User.token_version)
         )
 
-        await self.db.execute(stmt)
+        token_version = (await self.db.execute(stmt)).scalar_one_or_none()
         await self.db.commit()
+        principal_cache.invalidate(account_id)
+        if token_version is not None:
+            claims_revocations.revoke_user(account_id, token_version)
 
         account = await self.get_user_account(account_id)
 
@@ -1,3 +1,4 @@
+from src.core.principal import Principal
 from src.core.security import security
 from src.database.db import get_db
 from fastapi import APIRouter, Body, Depends, HTTPException
@@ -6,9 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import User
 from src.models.user import UserModel
 from src.repositories.auth import AuthRepository
-from src.schemas.auth import TokenModel
+from src.repositories.refresh_token import RefreshTokenRepository
+from src.schemas.auth import RefreshTokenRequest, TokenModel
 from src.schemas.user import UserCreate, UserLogin
-from src.services.auth import AuthService
+from src.services.auth import AuthService, TokenService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -35,11 +37,18 @@ async def signup(user: UserCreate = Body(...), db: AsyncSession = Depends(get_db
 async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     user_model = UserModel(db)
     user = await user_model.get_user_by_username(user_data.username)
-    if not user or not security.verify_password(user_data.password, user.password):
+    if not user or not await security.verify_password_async(user_data.password, user.password):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     
     if not await user_model.is_active(user):
         raise HTTPException(status_code=403, detail="User is not active")
 
-    tokens = security.generate_tokens(user.id)
-    return tokens
+    # roles and permissions are loaded with the user, signing them in lets
+    # claims-principal routes skip the lookup
+    service = TokenService(RefreshTokenRepository(db))
+    return await service.issue(Principal.from_user(user))
+
+@router.post("/refresh", response_model=TokenModel)
+async def refresh_tokens(data: RefreshTokenRequest = Body(...), db: AsyncSession = Depends(get_db)):
+    service = TokenService(RefreshTokenRepository(db))
+    return await service.refresh(data.refresh_token)
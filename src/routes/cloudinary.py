@@ -1,6 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, Form
-from src.database.models import User
-from src.core.dependencies import require_role
+from src.core.principal import Principal
+from src.core.dependencies import require_claims_role
 from src.services.cloudinary import UploadFileService
 
 router = APIRouter(prefix='/cloudinary', tags=['cloudinary'])
@@ -12,7 +12,7 @@ async def cloudinary_upload_image(
     height: str = Form(...),
     crop: str = Form(...),
     effect: str = Form(...),
-    user: User = require_role('user'),
+    user: Principal = require_claims_role('user'),
 ):
     image_url = await UploadFileService.upload_file(
         file=file, 
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from src.conf.config import settings
+from src.core.conditional import is_not_modified, not_modified_response, validator_headers
 from src.core.dependencies import require_permission, require_role, user_has_access_to_comment
-from src.database.models import Comment, User
+from src.core.principal import Principal
+from src.database.models import Comment
 from src.database.db import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.repositories.comment import CommentRepository
@@ -8,6 +11,7 @@ from src.schemas.comment import (
     CommentCreateModel, CommentResponse, CommentUpdateRequest, CommentUpdateResponse
 )
 from src.services.comment import CommentService
+from typing import Optional
 from uuid import UUID
 
 router = APIRouter(prefix="/posts", tags=["comments"])
@@ -16,7 +20,7 @@ router = APIRouter(prefix="/posts", tags=["comments"])
 async def add_comment(
     post_id: UUID,
     data: CommentCreateModel,
-    user: User = require_role("user"),
+    user: Principal = require_role("user"),
     db: AsyncSession = Depends(get_db)   
 ):
     service = CommentService(CommentRepository(db))
@@ -24,11 +28,27 @@ async def add_comment(
 
 @router.get("/{post_id}/comments", response_model=list[CommentResponse])
 async def get_comments(
+    request: Request,
     post_id: UUID,
+    response: Response,
+    before: Optional[str] = Query(None),
+    limit: int = Query(settings.COMMENTS_PAGE_SIZE, ge=1, le=settings.COMMENTS_MAX_PAGE_SIZE),
     db: AsyncSession = Depends(get_db)
 ):
     service = CommentService(CommentRepository(db))
-    return await service.get_comments(post_id)
+
+    # polling clients get a 304 after the narrow version query alone
+    validators = validator_headers(await service.get_comments_page_version(post_id, limit, before))
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+
+    comments, next_cursor = await service.get_comments_page(post_id, limit, before)
+
+    response.headers.update(validators)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return comments
 
 @router.get("/comments/{comment_id}", response_model=CommentResponse)
 async def get_comment(
@@ -44,7 +64,7 @@ update_access_dep = user_has_access_to_comment("update")
 async def update_comment(
     comment: Comment = update_access_dep,
     update_data: CommentUpdateRequest = Body(...),
-    user: User = require_role("user"),
+    user: Principal = require_role("user"),
     db: AsyncSession = Depends(get_db),
 ):
     service = CommentService(CommentRepository(db))
@@ -53,7 +73,7 @@ async def update_comment(
 @router.delete("/comments/{comment_id}")
 async def delete_comment(
     comment_id: UUID,
-    user: User = require_permission("delete_all_comments"),
+    user: Principal = require_permission("delete_all_comments"),
     db: AsyncSession = Depends(get_db),
 ):
     service = CommentService(CommentRepository(db))
@@ -0,0 +1,8 @@
+from fastapi import APIRouter
+from src.database.db import sessionmanager
+
+router = APIRouter(prefix='/health', tags=['health'])
+
+@router.get("/db-pool")
+async def get_db_pool_status():
+    return sessionmanager.pool_status()
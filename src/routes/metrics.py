@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.core.request_stats import request_metrics
+from src.database.db import sessionmanager
+
+router = APIRouter(tags=['metrics'])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    lines = [request_metrics.render()]
+
+    # connection pool figures, where the pool class exposes them
+    for name, value in sessionmanager.pool_status().items():
+        if isinstance(value, (int, float)):
+            kind = "counter" if name.endswith("_total") or name == "checkouts" else "gauge"
+            lines.append(f"# TYPE db_pool_{name} {kind}\ndb_pool_{name} {value}\n")
+
+    return PlainTextResponse("".join(lines), media_type="text/plain; version=0.0.4")
@@ -1,21 +1,30 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, status
-from src.core.dependencies import user_has_access, require_role
-from src.database.db import get_db
-from src.database.models import Post, User
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from src.conf.config import settings
+from src.core.conditional import is_not_modified, not_modified_response, validator_headers
+from src.core.dependencies import post_write_owner, require_claims_role, require_role
+from src.core.response_cache import POSTS_NAMESPACE, CachedResponse, response_cache
+from src.database.db import get_db, get_session_factory
+from src.core.principal import Principal
 from src.repositories.post import PostRepository
+from src.repositories.rating import RatingRepository
 from src.services.post import PostService
-from src.services.qr import QrCodeService
+from src.services.rating import RatingService
+from src.services.qr import MEDIA_TYPES, QrCodeService
 from src.schemas.post import PostCreateModel, PostCreateResponse, PostResponse, PostUpdateRequest
+from src.schemas.rating import RatingCreateModel, RatingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
 
 router = APIRouter(prefix='/posts', tags=['posts'])
 
+post_list_adapter = TypeAdapter(List[PostResponse])
+
 @router.post("/", response_model=PostCreateResponse)
 async def create_post(
     post_data: PostCreateModel = Body(...),
-    user: User = require_role('user'),
+    user: Principal = require_role('user'),
     db: AsyncSession = Depends((get_db))
 ): 
 
@@ -24,17 +33,14 @@ async def create_post(
 
 @router.delete("/{post_id}", response_model=bool)
 async def delete_post(
-    post: Post = user_has_access('delete'),
-    user: User = require_role('user'),
+    post_id: UUID,
+    owner_id: Optional[UUID] = post_write_owner('delete'),
+    user: Principal = require_role('user'),
     db: AsyncSession = Depends(get_db),
 ):
     service = PostService(PostRepository(db))
-    post = await service.get_post_by_id(post.id)
 
-    if post is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    
-    if not await service.delete_post(post.id):
+    if not await service.delete_post(post_id, owner_id=owner_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Post not found"
@@ -44,45 +50,130 @@ async def delete_post(
 
 @router.put("/{post_id}", response_model=PostResponse)
 async def update_post(
-    post: Post = user_has_access('update'), 
+    post_id: UUID,
     update_data: PostUpdateRequest = Body(...),
-    user: User = require_role('user'),
+    owner_id: Optional[UUID] = post_write_owner('update'),
+    user: Principal = require_role('user'),
     db: AsyncSession = Depends(get_db)
 ):
     service = PostService(PostRepository(db))
-    post = await service.get_post_by_id(post.id)
 
-    if post is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    
-    if not await service.update_post(post.id, update_data.description):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
-    return await service.update_post(post.id, update_data.description)
+    return await service.update_post(post_id, update_data.description, owner_id=owner_id)
+
+@router.post("/{post_id}/rating", response_model=RatingResponse)
+async def rate_post(
+    post_id: UUID,
+    data: RatingCreateModel = Body(...),
+    user: Principal = require_role('user'),
+    db: AsyncSession = Depends(get_db)
+):
+    service = RatingService(RatingRepository(db))
+
+    return await service.rate_post(post_id, data, user)
+
+@router.get("/search", response_model=List[PostResponse])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(settings.POSTS_PAGE_SIZE, ge=1, le=settings.POSTS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=settings.SEARCH_MAX_OFFSET),
+    session_factory = Depends(get_session_factory),
+):
+    entry_key = await response_cache.entry_key(POSTS_NAMESPACE, f"search:{limit}:{offset}:{q}")
+    cached = await response_cache.get(entry_key)
+
+    if cached is None:
+        async with session_factory() as db:
+            service = PostService(PostRepository(db))
+            posts, next_offset = await service.search_posts(q, limit, offset)
+
+        headers = {"X-Next-Offset": str(next_offset)} if next_offset is not None else {}
+        cached = CachedResponse(post_list_adapter.dump_json(posts), headers)
+        await response_cache.set(entry_key, cached)
+
+    return cached.as_response()
 
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(
+    request: Request,
     post_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    session_factory = Depends(get_session_factory)
 ):
-    service = PostService(PostRepository(db))
-    
-    return await service.get_post_by_id(post_id)
+    # anonymous and identical for every viewer, a hit never opens a session
+    entry_key = await response_cache.entry_key(POSTS_NAMESPACE, f"post:{post_id}")
+    cached = await response_cache.get(entry_key)
+
+    if cached is None:
+        async with session_factory() as db:
+            service = PostService(PostRepository(db))
+            # validators come from a narrow query, the body is only built when needed
+            validators = validator_headers(await service.get_post_version(post_id))
+            if is_not_modified(request, validators):
+                return not_modified_response(validators)
+
+            post = await service.get_post_by_id(post_id)
+
+        cached = CachedResponse(post.model_dump_json().encode(), validators)
+        await response_cache.set(entry_key, cached)
+
+    if is_not_modified(request, cached.headers):
+        return not_modified_response(cached.headers)
+
+    return cached.as_response()
 
 @router.get("/", response_model=List[PostResponse])
 async def get_posts(
-    db: AsyncSession = Depends(get_db), 
+    request: Request,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.POSTS_PAGE_SIZE, ge=1, le=settings.POSTS_MAX_PAGE_SIZE),
+    session_factory = Depends(get_session_factory),
 ):
-    service = PostService(PostRepository(db))
-    
-    return await service.get_all_posts()
+    entry_key = await response_cache.entry_key(POSTS_NAMESPACE, f"feed:{limit}:{cursor or ''}")
+    cached = await response_cache.get(entry_key)
+
+    if cached is None:
+        async with session_factory() as db:
+            service = PostService(PostRepository(db))
+            validators = validator_headers(await service.get_posts_page_version(limit, cursor))
+            if is_not_modified(request, validators):
+                return not_modified_response(validators)
+
+            posts, next_cursor = await service.get_posts_page(limit, cursor)
+
+        headers = {**validators, "X-Next-Cursor": next_cursor} if next_cursor else validators
+        cached = CachedResponse(post_list_adapter.dump_json(posts), headers)
+        await response_cache.set(entry_key, cached)
+
+    if is_not_modified(request, cached.headers):
+        return not_modified_response(cached.headers)
+
+    return cached.as_response()
 
 @router.post("/generate-qr-code")
 async def generate_qr_code_from_url(
+    request: Request,
     url: str = Body(..., embed=True),
-    user: User = require_role('user'),
+    output: Literal["data_uri", "png", "svg"] = Body("data_uri", embed=True),
+    box_size: int = Body(10, ge=1, le=40, embed=True),
+    border: int = Body(4, ge=0, le=20, embed=True),
+    user: Principal = require_claims_role('user'),
 ):
+    fmt = "svg" if output == "svg" else "png"
+
+    if output != "data_uri":
+        etag = QrCodeService.etag(url, fmt, box_size, border)
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     try:
-        qr_code_data = QrCodeService.generate_qr_code(url)
-        return qr_code_data
+        image = await QrCodeService.render_async(url, fmt, box_size, border)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"QR generation failed: {str(e)}")
+
+    if output == "data_uri":
+        return QrCodeService.to_data_uri(url, image)
+
+    return Response(content=image, media_type=MEDIA_TYPES[fmt], headers=headers)
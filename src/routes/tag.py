@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query, Response
+from src.conf.config import settings
+from src.database.db import get_db
+from src.repositories.tag import TagRepository
+from src.schemas.post import PostResponse
+from src.schemas.tag import TagResponse
+from src.services.tag import TagService
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+router = APIRouter(prefix='/tags', tags=['tags'])
+
+@router.get("/autocomplete", response_model=List[TagResponse])
+async def autocomplete_tags(
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(settings.TAG_SUGGESTIONS_LIMIT, ge=1, le=settings.TAG_SUGGESTIONS_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db)
+):
+    service = TagService(TagRepository(db))
+    return await service.suggest_tags(q, limit)
+
+@router.get("/{name}/posts", response_model=List[PostResponse])
+async def get_tag_posts(
+    name: str,
+    response: Response,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.POSTS_PAGE_SIZE, ge=1, le=settings.POSTS_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    service = TagService(TagRepository(db))
+    posts, next_cursor = await service.get_tag_posts_page(name, limit, cursor)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return posts
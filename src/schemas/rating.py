@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from pydantic.config import ConfigDict
+from typing import Optional
+from uuid import UUID
+
+class RatingCreateModel(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+
+    model_config = ConfigDict(from_attributes=True)
+
+class RatingResponse(BaseModel):
+    post_id: UUID
+    rating: int
+    created: bool
+    avg_rating: Optional[float] = None
+    rating_count: int
+
+    model_config = ConfigDict(from_attributes=True)
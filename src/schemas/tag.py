@@ -5,4 +5,10 @@ from typing import Optional
 class TagsShortResponse(BaseModel):
     name: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class TagResponse(BaseModel):
+    name: str
+    post_count: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,14 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from jose.exceptions import ExpiredSignatureError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from src.conf.config import settings
-from src.database.db import get_db
-from src.database.models import User
+from src.core.principal import Principal, claims_revocations, principal_cache
+from src.database.db import get_db, get_session_factory
+from src.core.security import security
+from src.database.models import Role, User, UserStatusEnum
 from src.repositories.auth import AuthRepository
+from src.repositories.refresh_token import RefreshTokenRepository
+from uuid import UUID
 
 class AuthService:
     def __init__(self, auth_repo: AuthRepository):
@@ -22,22 +25,68 @@ class AuthService:
     ):
         return await self.auth_repo.create_user(user_data, user_role)
     
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+class TokenService:
+    def __init__(self, token_repo: RefreshTokenRepository):
+        self.token_repo = token_repo
+        self.db = token_repo.db
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-    ) -> User:
-    try:
-        token = token.strip().replace('"', "")
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
+    async def issue(self, principal: Principal, family_id: UUID | None = None) -> dict[str, str]:
+        tokens = security.generate_tokens(principal.id, principal.to_claims())
+        await self.token_repo.add(principal.id, tokens["refresh_token"], family_id)
+
+        return tokens
 
-        if user_id is None:
+    async def refresh(self, refresh_token: str) -> dict[str, str]:
+        # renewal is a signature check and a few indexed statements, never bcrypt
+        try:
+            security.decode_refresh_token(refresh_token)
+        except ExpiredSignatureError:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: Missing user ID",
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expired"
             )
-        
-        stmt = select(User).options(selectinload(User.roles)).where(User.id == user_id)
+        except JWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+            )
+
+        user_id, family_id = await self.token_repo.rotate(refresh_token)
+        principal = await _load_principal(user_id, {}, self.db)
+
+        if principal.status != UserStatusEnum.active:
+            await self.token_repo.revoke_family(family_id)
+            raise HTTPException(status_code=403, detail="User is not active")
+
+        return await self.issue(principal, family_id)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
+
+def _decode_access_token(token: str) -> tuple[UUID, dict]:
+    payload = security.decode_access_token(token)
+    user_id: str = payload.get("sub")
+
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: Missing user ID",
+        )
+
+    try:
+        return UUID(user_id), payload
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: Malformed user ID",
+        )
+
+async def _load_principal(user_id: UUID, payload: dict, db: AsyncSession) -> Principal:
+    principal = principal_cache.get(user_id)
+
+    if principal is None:
+        stmt = (
+            select(User)
+            .options(selectinload(User.roles).selectinload(Role.permissions))
+            .where(User.id == user_id)
+        )
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
 
@@ -46,7 +95,60 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
             )
 
-        return user
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+
+    # tokens issued before the last token_version bump are revoked
+    token_version = payload.get("ver")
+    if token_version is not None and token_version != principal.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked"
+        )
+
+    return principal
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+    ) -> Principal:
+    try:
+        user_id, payload = _decode_access_token(token)
+
+        return await _load_principal(user_id, payload, db)
+    except HTTPException:
+        raise
+
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
+        )
+
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}",
+        )
+
+async def get_claims_principal(
+    token: str = Depends(oauth2_scheme),
+    session_factory = Depends(get_session_factory)
+) -> Principal:
+    # opt-in fast path: the signed role/permission claims are trusted as is, a
+    # session is only opened for tokens without claims or with stale ones
+    try:
+        user_id, payload = _decode_access_token(token)
+
+        if "roles" in payload and claims_revocations.trusts(user_id, payload):
+            return Principal.from_claims(user_id, payload)
+
+        async with session_factory() as db:
+            return await _load_principal(user_id, payload, db)
+    except HTTPException:
+        raise
+
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
@@ -1,16 +1,45 @@
 from src.conf.config import settings
+from src.core.workers import BoundedWorkerPool
 from fastapi import UploadFile, HTTPException
+from typing import BinaryIO
 
 import cloudinary
 import cloudinary.uploader
+import os
 
 class UploadFileService:
+    _configured = False
+    _pool = BoundedWorkerPool(
+        max_workers=settings.CLD_MAX_CONCURRENT_UPLOADS,
+        max_pending=settings.CLD_MAX_PENDING_UPLOADS,
+        name="cloudinary-upload",
+    )
+
     @staticmethod
     def configure_cloudinary():
+        # configured once at startup, later calls are no-ops
+        if UploadFileService._configured:
+            return
+
         cloudinary.config(
             cloud_name=settings.CLD_NAME,
             api_key=settings.CLD_API_KEY,
-            api_secret=settings.CLD_API_SECRET
+            api_secret=settings.CLD_API_SECRET,
+            upload_prefix=settings.CLD_UPLOAD_PREFIX
+        )
+        UploadFileService._configured = True
+
+    @staticmethod
+    def transfer(stream: BinaryIO, size: int, filename: str | None) -> dict:
+        # runs on a worker thread; files above one chunk are sent piece by piece
+        # so at most CLD_UPLOAD_CHUNK_SIZE bytes are held in memory
+        if size <= settings.CLD_UPLOAD_CHUNK_SIZE:
+            return cloudinary.uploader.upload(stream)
+
+        return cloudinary.uploader.upload_large(
+            stream,
+            chunk_size=settings.CLD_UPLOAD_CHUNK_SIZE,
+            filename=filename or "stream"
         )
 
     @staticmethod
@@ -23,8 +52,15 @@ class UploadFileService:
     ) -> str:
         UploadFileService.configure_cloudinary()
 
+        size = file.size
+        if size is None:
+            size = file.file.seek(0, os.SEEK_END)
+            file.file.seek(0)
+
         try:
-            result = cloudinary.uploader.upload(file.file)
+            result = await UploadFileService._pool.run(
+                UploadFileService.transfer, file.file, size, file.filename
+            )
             public_id = result.get("public_id")
 
             transformation = {
@@ -39,5 +75,7 @@ class UploadFileService:
                 version=result.get("version")
             )
             return url_link
+        except HTTPException:
+            raise
         except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Upload with filters failed: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=400, detail=f"Upload with filters failed: {str(e)}")
@@ -1,7 +1,10 @@
 from fastapi import HTTPException
-from src.database.models import User
+from src.core.pagination import decode_cursor, encode_cursor
+from src.core.principal import Principal
+from src.database.models import Comment
 from src.repositories.comment import CommentRepository
 from src.schemas.comment import CommentUpdateRequest
+from typing import List
 from uuid import UUID
 
 class CommentService:
@@ -15,13 +18,40 @@ class CommentService:
     def get_comments(self, post_id: UUID):
         return self.comment_repo.get_comments(post_id)
 
+    async def get_comments_page_version(
+        self,
+        post_id: UUID,
+        limit: int,
+        cursor: str | None = None
+    ) -> list[tuple]:
+        before = decode_cursor(cursor) if cursor else None
+        # the extra row is included, a page that gains a successor changes too
+        return await self.comment_repo.get_comments_version(post_id, limit=limit + 1, before=before)
+
+    async def get_comments_page(
+        self,
+        post_id: UUID,
+        limit: int,
+        cursor: str | None = None
+    ) -> tuple[List[Comment], str | None]:
+        before = decode_cursor(cursor) if cursor else None
+        # fetch one extra row to know whether another page exists
+        comments = await self.comment_repo.get_comments(post_id, limit=limit + 1, before=before)
+
+        next_cursor = None
+        if len(comments) > limit:
+            comments = comments[:limit]
+            next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+
+        return comments, next_cursor
+
     def get_comment(self, comment_id):
         return self.comment_repo.get_comment(comment_id)
     
     async def update_comment(self, comment_id: UUID, update_data: CommentUpdateRequest):
         return await self.comment_repo.update(comment_id, update_data.message)
     
-    async def delete_comment(self, comment_id: UUID, user: User):
+    async def delete_comment(self, comment_id: UUID, user: Principal):
         comment = await self.comment_repo.get_comment(comment_id)
         if comment is None:
             raise HTTPException(status_code=404, detail="Comment not found")
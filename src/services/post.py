@@ -1,4 +1,6 @@
-from src.database.models import User
+from src.conf.config import settings
+from src.core.pagination import decode_cursor, encode_cursor
+from src.core.principal import Principal
 from src.repositories.post import PostRepository
 from src.schemas.post import PostResponse
 from typing import List
@@ -12,22 +14,70 @@ class PostService:
     async def create_post(
         self,
         post_data: dict,
-        user: User
+        user: Principal
     ):
         return await self.post_repo.create(post_data=post_data, user=user)
     
     async def get_post_by_id(self, post_id: UUID) -> PostResponse:
         return await self.post_repo.get_post(post_id)
     
-    async def delete_post(self, post_id: UUID) -> bool:
-        return await self.post_repo.delete_post(post_id)
+    async def delete_post(self, post_id: UUID, owner_id: UUID | None = None) -> bool:
+        return await self.post_repo.delete_post(post_id, owner_id=owner_id)
     
     async def update_post(
         self,
         post_id: UUID,
-        description: str = None
+        description: str = None,
+        owner_id: UUID | None = None
     ) -> PostResponse:
-        return await self.post_repo.update_post(post_id, description)
+        return await self.post_repo.update_post(post_id, description, owner_id=owner_id)
     
     async def get_all_posts(self) -> List[PostResponse]:
         return await self.post_repo.get_posts()
+
+    async def get_post_version(self, post_id: UUID) -> list[tuple]:
+        return await self.post_repo.get_post_version(post_id)
+
+    async def get_posts_page_version(self, limit: int, cursor: str | None = None) -> list[tuple]:
+        after = decode_cursor(cursor) if cursor else None
+        # the extra row is included, a page that gains a successor changes too
+        return await self.post_repo.get_posts_version(limit=limit + 1, after=after)
+
+    async def get_posts_page(
+        self,
+        limit: int,
+        cursor: str | None = None
+    ) -> tuple[List[PostResponse], str | None]:
+        after = decode_cursor(cursor) if cursor else None
+        # fetch one extra row to know whether another page exists
+        posts = await self.post_repo.get_posts(limit=limit + 1, after=after)
+
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id)
+
+        return posts, next_cursor
+
+    async def search_posts(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0
+    ) -> tuple[List[PostResponse], int | None]:
+        query = query.strip()
+        if not query:
+            return [], None
+
+        # ranked results cannot be keyset paginated, one extra row tells whether
+        # another page exists
+        posts = await self.post_repo.search_posts(query, limit=limit + 1, offset=offset)
+
+        next_offset = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            # never point at a page the route's offset bound would reject
+            if offset + limit <= settings.SEARCH_MAX_OFFSET:
+                next_offset = offset + limit
+
+        return posts, next_offset
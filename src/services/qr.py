@@ -1,16 +1,71 @@
 from io import BytesIO
+from qrcode.image.svg import SvgPathImage
+from src.conf.config import settings
+from src.core.cache import LRUCache
+from src.core.workers import BoundedWorkerPool
 
 import base64
+import hashlib
 import qrcode
 
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
 class QrCodeService:
+    _cache = LRUCache(maxsize=settings.QR_CACHE_MAX_SIZE)
+    _pool = BoundedWorkerPool(
+        max_workers=settings.QR_RENDER_WORKERS,
+        max_pending=settings.QR_MAX_PENDING_RENDERS,
+        name="qr-render",
+    )
+
+    @staticmethod
+    def etag(url: str, fmt: str = "png", box_size: int = 10, border: int = 4) -> str:
+        # derived from the render options, so a match needs no rendering at all
+        digest = hashlib.sha1(f"{fmt}|{box_size}|{border}|{url}".encode()).hexdigest()
+        return f'"{digest}"'
+
     @staticmethod
-    def generate_qr_code(url: str) -> str:
-        img = qrcode.make(url)
+    def render(url: str, fmt: str = "png", box_size: int = 10, border: int = 4) -> bytes:
+        key = (url, fmt, box_size, border)
+        image = QrCodeService._cache.get(key)
+        if image is not None:
+            return image
+
+        qr = qrcode.QRCode(box_size=box_size, border=border)
+        qr.add_data(url)
+        qr.make(fit=True)
+
+        # svg is written as vector paths and skips raster encoding entirely
+        if fmt == "svg":
+            img = qr.make_image(image_factory=SvgPathImage)
+        else:
+            img = qr.make_image()
+
         img_byte_arr = BytesIO()
-        img.save(img_byte_arr, format="PNG")
-        img_byte_arr.seek(0)
-        qr_code_base64 = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
+        img.save(img_byte_arr)
+        image = img_byte_arr.getvalue()
+
+        QrCodeService._cache.set(key, image)
+        return image
+
+    @staticmethod
+    async def render_async(url: str, fmt: str = "png", box_size: int = 10, border: int = 4) -> bytes:
+        image = QrCodeService._cache.get((url, fmt, box_size, border))
+        if image is not None:
+            return image
+
+        return await QrCodeService._pool.run(QrCodeService.render, url, fmt, box_size, border)
+
+    @staticmethod
+    def to_data_uri(url: str, image: bytes) -> dict:
+        qr_code_base64 = base64.b64encode(image).decode('utf-8')
         qr_code = f"data:image/png;base64,{qr_code_base64}"
-        
-        return {"qr_code": qr_code, "qr_code_url": url}
\ No newline at end of file
+
+        return {"qr_code": qr_code, "qr_code_url": url}
+
+    @staticmethod
+    def generate_qr_code(url: str) -> dict:
+        return QrCodeService.to_data_uri(url, QrCodeService.render(url))
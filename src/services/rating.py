@@ -0,0 +1,12 @@
+from src.core.principal import Principal
+from src.repositories.rating import RatingRepository
+from src.schemas.rating import RatingCreateModel, RatingResponse
+from uuid import UUID
+
+class RatingService:
+    def __init__(self, rating_repo: RatingRepository):
+        self.rating_repo = rating_repo
+        self.db = rating_repo.db
+
+    async def rate_post(self, post_id: UUID, data: RatingCreateModel, user: Principal) -> RatingResponse:
+        return await self.rating_repo.upsert_rating(post_id, user.id, data.rating)
@@ -0,0 +1,35 @@
+from fastapi import HTTPException
+from src.core.pagination import decode_cursor, encode_cursor
+from src.repositories.tag import TagRepository
+from src.schemas.post import PostResponse
+from src.schemas.tag import TagResponse
+from typing import List
+
+class TagService:
+    def __init__(self, tag_repo: TagRepository):
+        self.tag_repo = tag_repo
+        self.db = tag_repo.db
+
+    async def get_tag_posts_page(
+        self,
+        name: str,
+        limit: int,
+        cursor: str | None = None
+    ) -> tuple[List[PostResponse], str | None]:
+        after = decode_cursor(cursor) if cursor else None
+        # fetch one extra row to know whether another page exists
+        posts = await self.tag_repo.get_tag_posts(name, limit=limit + 1, after=after)
+
+        # an empty page is the only case that needs to tell a missing tag apart
+        if not posts and not await self.tag_repo.tag_exists(name):
+            raise HTTPException(status_code=404, detail="Tag not found")
+
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id)
+
+        return posts, next_cursor
+
+    async def suggest_tags(self, query: str, limit: int) -> List[TagResponse]:
+        return await self.tag_repo.suggest_tags(query, limit)
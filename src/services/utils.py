@@ -1,6 +1,49 @@
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 from src.conf.config import settings
 
-import logging
+import atexit, copy, json, logging, random
+
+# Log calls only enqueue the record; a listener thread formats and writes it,
+# so disk latency never reaches the event loop. Use %-style arguments
+# (logger.debug("x %s", y)) so a disabled or sampled-out call formats nothing.
+
+class JsonFormatter(logging.Formatter):
+    # one JSON object per line
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": f"{self.formatTime(record, '%Y-%m-%dT%H:%M:%S')}.{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+class RecordQueueHandler(QueueHandler):
+    # QueueHandler.prepare formats the traceback into the message on the
+    # calling thread and drops exc_info. Only the message is merged here, since
+    # its arguments may change once the call returns; the traceback reaches
+    # the listener intact and is formatted there, into its own field
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class SamplingFilter(logging.Filter):
+    # keeps only a fraction of DEBUG records, everything above passes
+    def __init__(self, debug_rate: float):
+        super().__init__()
+        self.debug_rate = debug_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.debug_rate
+
 logger = logging.getLogger(__name__)
 
 if settings.ENV_APP == 'development':
@@ -8,7 +51,16 @@ if settings.ENV_APP == 'development':
 else:
     logger.setLevel(logging.INFO)
 
-handler = logging.FileHandler('app.log')
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+log_queue = SimpleQueue()
+
+file_handler = logging.FileHandler(settings.LOG_FILE)
+file_handler.setFormatter(JsonFormatter())
+
+queue_handler = RecordQueueHandler(log_queue)
+queue_handler.addFilter(SamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+logger.addHandler(queue_handler)
+
+listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+listener.start()
+# drains whatever is still queued on interpreter exit
+atexit.register(listener.stop)
@@ -1,8 +1,9 @@
 
+from contextlib import contextmanager
 from datetime import datetime
 from fastapi.testclient import TestClient
 from main import app
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, select
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from src.core.security import security
 from src.database.models import Base, Comment, User, UserStatusEnum
@@ -141,6 +142,25 @@ async def test_user(db_session):
     await db_session.refresh(user)
     return user
 
+@pytest.fixture
+def count_queries():
+    # with count_queries(engine) as statements: ... collects every SQL statement
+    # sent to the driver inside the block, executemany batches count once
+    @contextmanager
+    def counting(engine):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    return counting
+
 @pytest.fixture
 def mock_upload():
     with patch("src.services.cloudinary.UploadFileService.upload_file", new_callable=AsyncMock) as mock:
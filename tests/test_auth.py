@@ -1,14 +1,16 @@
 from datetime import datetime
-from fastapi import status
+from contextlib import asynccontextmanager
+from fastapi import HTTPException, status
 from fastapi.testclient import TestClient
 from main import app
 from sqlalchemy.future import select
 from src.core.security import security
 from src.database.db import get_db
-from src.database.models import User, UserStatusEnum
+from src.core.principal import Principal, claims_revocations, principal_cache
+from src.database.models import Role, User, UserStatusEnum
 from src.repositories.auth import AuthRepository
 from src.schemas.user import UserCreate
-from src.services.auth import get_current_user
+from src.services.auth import get_claims_principal, get_current_user
 from src.services.utils import logger
 from unittest.mock import ANY, AsyncMock, patch, MagicMock
 from uuid import UUID, uuid4
@@ -186,7 +188,32 @@ async def test_get_current_user_success():
     print("Is coroutine?", callable(result))
     print("Result repr:", repr(result))
 
-    assert result.email == "test@example.com"
+    assert result.id == user.id
+    assert result.roles == frozenset()
+
+@pytest.mark.asyncio
+async def test_get_current_user_cached_principal_skips_db():
+    user = User(id=uuid4(), username="cached", status="active", roles=[Role(name="user")])
+
+    result_mock = MagicMock()
+    result_mock.scalar_one_or_none.return_value = user
+
+    fake_db = AsyncMock()
+    fake_db.execute.return_value = result_mock
+
+    token = security.create_token('access', user.id)
+
+    first = await get_current_user(token, fake_db)
+    second = await get_current_user(token, fake_db)
+
+    assert second is first
+    assert second.roles == frozenset({"user"})
+    fake_db.execute.assert_awaited_once()
+
+    principal_cache.invalidate(user.id)
+    await get_current_user(token, fake_db)
+
+    assert fake_db.execute.await_count == 2
 
 @pytest.mark.asyncio
 @patch("src.repositories.auth.RoleRepository", autospec=True)
@@ -221,3 +248,75 @@ async def test_create_user_roles(mock_user_model_class, mock_role_repo_class):
 
     assert fake_role in result
     assert len(result) == 2
+
+def session_factory_for(db):
+    opened = []
+
+    @asynccontextmanager
+    async def session_factory():
+        opened.append(True)
+        yield db
+
+    return session_factory, opened
+
+def claims_token(user: User) -> str:
+    return security.create_token('access', user.id, Principal.from_user(user).to_claims())
+
+@pytest.mark.asyncio
+async def test_claims_principal_skips_the_session():
+    user = User(id=uuid4(), username="claimed", status="active", token_version=0, roles=[Role(name="user")])
+    session_factory, opened = session_factory_for(AsyncMock())
+
+    principal = await get_claims_principal(claims_token(user), session_factory)
+
+    assert (principal.id, principal.username, principal.roles) == (user.id, "claimed", frozenset({"user"}))
+    assert opened == []
+
+@pytest.mark.asyncio
+async def test_claims_principal_falls_back_to_lookup():
+    user = User(id=uuid4(), username="legacy", status="active", token_version=0, roles=[Role(name="user")])
+
+    result_mock = MagicMock()
+    result_mock.scalar_one_or_none.return_value = user
+    fake_db = AsyncMock()
+    fake_db.execute.return_value = result_mock
+    session_factory, opened = session_factory_for(fake_db)
+
+    # a token without claims
+    principal = await get_claims_principal(security.create_token('access', user.id), session_factory)
+    assert principal.roles == frozenset({"user"})
+    assert opened == [True]
+
+    # claims past their short TTL
+    expired = {**Principal.from_user(user).to_claims(), "cexp": 0}
+    await get_claims_principal(security.create_token('access', user.id, expired), session_factory)
+    assert len(opened) == 2
+
+    principal_cache.invalidate(user.id)
+
+@pytest.mark.asyncio
+async def test_token_version_bump_revokes_claims_tokens():
+    user = User(id=uuid4(), username="banned", status="active", token_version=0, roles=[Role(name="user")])
+    token = claims_token(user)
+
+    # the status change bumped the version, this process saw it
+    user.token_version = 1
+    claims_revocations.revoke_user(user.id, 1)
+
+    result_mock = MagicMock()
+    result_mock.scalar_one_or_none.return_value = user
+    fake_db = AsyncMock()
+    fake_db.execute.return_value = result_mock
+    session_factory, opened = session_factory_for(fake_db)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_claims_principal(token, session_factory)
+
+    assert exc_info.value.detail == "Token revoked"
+    assert opened == [True]
+
+    # the regular dependency applies the same check
+    with pytest.raises(HTTPException):
+        await get_current_user(token, fake_db)
+
+    principal_cache.invalidate(user.id)
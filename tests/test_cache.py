@@ -0,0 +1,39 @@
+from src.core.cache import LRUCache
+from unittest.mock import patch
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=10, ttl=30)
+
+    with patch("src.core.cache.monotonic", return_value=100.0):
+        cache.set("key", "value")
+
+    with patch("src.core.cache.monotonic", return_value=129.0):
+        assert cache.get("key") == "value"
+
+    with patch("src.core.cache.monotonic", return_value=131.0):
+        assert cache.get("key") is None
+
+def test_lru_cache_invalidate_and_clear():
+    cache = LRUCache(maxsize=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert len(cache) == 0
@@ -3,25 +3,24 @@ import pytest
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from main import app
-from src.database.models import User, Role
+from src.core.principal import Principal
 
 client = TestClient(app)
 
 @pytest.fixture
 def fake_user():
-    return User(
+    return Principal(
         id="fake-id",
         username="tester",
-        roles=[Role(id=1, name="user")],
-        email="tester@example.com",
-        password="hashed",
-        status="active"
+        status="active",
+        roles=frozenset({"user"}),
+        permissions=frozenset()
     )
 
 @pytest.fixture(autouse=True)
 def override_get_current_user(fake_user):
-    from src.core.dependencies import get_current_user
-    app.dependency_overrides[get_current_user] = lambda: fake_user
+    from src.core.dependencies import get_claims_principal
+    app.dependency_overrides[get_claims_principal] = lambda: fake_user
     yield
     app.dependency_overrides.clear()
 
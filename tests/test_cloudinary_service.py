@@ -9,15 +9,16 @@ from io import BytesIO
 from fastapi import UploadFile
 from unittest.mock import MagicMock
 from src.services.cloudinary import UploadFileService
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-import pytest
+import cloudinary as cloudinary_sdk, json, pytest, threading
 
 client = TestClient(app)
 def fake_current_user():
     FakeRole = type("Role", (), {"name": "user"})
     return User(id=uuid4(), username="neo", status="active", roles=[FakeRole()])
 
-app.dependency_overrides[cloudinary.require_role("user")] = lambda: fake_current_user()
+app.dependency_overrides[cloudinary.require_claims_role("user")] = lambda: fake_current_user()
 
 @pytest.mark.asyncio
 @patch("src.services.cloudinary.cloudinary.uploader.upload")
@@ -68,3 +69,78 @@ async def test_upload_file_exception(mock_configure, mock_upload):
     assert "Upload with filters failed: Upload failed" in exc_info.value.detail
     mock_configure.assert_called_once()
     mock_upload.assert_called_once()
+
+@pytest.fixture
+def fake_upload_endpoint():
+    requests = []
+
+    class FakeUploadHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            requests.append({
+                "path": self.path,
+                "content_range": self.headers.get("Content-Range"),
+                "size": len(body),
+            })
+            payload = json.dumps({"public_id": "fake_public_id", "version": 42}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeUploadHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    UploadFileService._configured = False
+    with patch("src.services.cloudinary.settings.CLD_UPLOAD_PREFIX", f"http://127.0.0.1:{server.server_port}"):
+        UploadFileService.configure_cloudinary()
+        yield requests
+
+    server.shutdown()
+    cloudinary_sdk.config(upload_prefix=None)
+
+@pytest.mark.asyncio
+async def test_upload_file_against_fake_endpoint(fake_upload_endpoint):
+    fake_file = UploadFile(filename="small.jpg", file=BytesIO(b"small image"))
+
+    result = await UploadFileService.upload_file(
+        file=fake_file, width=100, height=100, crop="fill", effect="sepia"
+    )
+
+    assert "fake_public_id" in result
+    assert len(fake_upload_endpoint) == 1
+    assert fake_upload_endpoint[0]["path"].endswith("/image/upload")
+    assert fake_upload_endpoint[0]["content_range"] is None
+
+@pytest.mark.asyncio
+@patch("src.services.cloudinary.settings.CLD_UPLOAD_CHUNK_SIZE", 1024)
+async def test_upload_file_streams_large_files_in_chunks(fake_upload_endpoint):
+    fake_file = UploadFile(filename="large.jpg", file=BytesIO(b"x" * 2500))
+
+    result = await UploadFileService.upload_file(
+        file=fake_file, width=100, height=100, crop="fill", effect="sepia"
+    )
+
+    assert "fake_public_id" in result
+    assert [r["content_range"] for r in fake_upload_endpoint] == [
+        "bytes 0-1023/2500", "bytes 1024-2047/2500", "bytes 2048-2499/2500"
+    ]
+
+@pytest.mark.asyncio
+@patch("src.services.cloudinary.cloudinary.uploader.upload")
+async def test_upload_file_rejected_when_pool_saturated(mock_upload):
+    fake_file = UploadFile(filename="busy.jpg", file=BytesIO(b"busy"))
+
+    with patch.object(UploadFileService._pool, "pending", UploadFileService._pool.max_pending):
+        with pytest.raises(HTTPException) as exc_info:
+            await UploadFileService.upload_file(
+                file=fake_file, width=100, height=100, crop="fill", effect="sepia"
+            )
+
+    assert exc_info.value.status_code == 503
+    mock_upload.assert_not_called()
@@ -1,5 +1,7 @@
-from datetime import datetime
-from src.database.models import Comment, User
+from datetime import datetime, timedelta
+from src.database.models import Comment, Post, User
+from src.repositories.comment import CommentRepository
+from src.schemas.user import UserShortResponse
 from uuid import uuid4
 from unittest.mock import MagicMock, AsyncMock
 
@@ -26,32 +28,28 @@ async def test_add_comment(fake_comment_repo, async_fake_db, fake_comment):
 @pytest.mark.asyncio
 async def test_get_comments(fake_comment_repo, async_fake_db):
     post_id = uuid4()
-    user = User(id=uuid4(), username="tester")
-
-    fake_comment1 = Comment(
-        id=uuid4(),
-        post_id=post_id,
-        user_id=user.id,
-        message="First comment",
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-        user=user
-    )
-    fake_comment2 = Comment(
-        id=uuid4(),
-        post_id=post_id,
-        user_id=user.id,
-        message="Second comment",
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
-        user=user
-    )
-
-    # Mock scalars().all() chain
-    scalars_mock = MagicMock()
-    scalars_mock.all.return_value = [fake_comment1, fake_comment2]
+    user_id = uuid4()
+
+    rows = [
+        {
+            "id": uuid4(),
+            "post_id": post_id,
+            "user_id": user_id,
+            "message": message,
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+            "author_id": user_id,
+            "author_username": "tester",
+            "author_img_link": None
+        }
+        for message in ("First comment", "Second comment")
+    ]
+
+    # Mock mappings().all() chain
+    mappings_mock = MagicMock()
+    mappings_mock.all.return_value = rows
     result_mock = MagicMock()
-    result_mock.scalars.return_value = scalars_mock
+    result_mock.mappings.return_value = mappings_mock
     async_fake_db.execute = AsyncMock(return_value=result_mock)
 
     comments = await fake_comment_repo.get_comments(post_id)
@@ -59,6 +57,7 @@ async def test_get_comments(fake_comment_repo, async_fake_db):
     assert len(comments) == 2
     assert comments[0].message == "First comment"
     assert comments[1].message == "Second comment"
+    assert comments[0].user.username == "tester"
     async_fake_db.execute.assert_called_once()
 
 @pytest.mark.asyncio
@@ -144,3 +143,41 @@ async def test_delete_comment_not_found(fake_comment_repo, async_fake_db):
     assert result is False
     async_fake_db.execute.assert_not_called()
     async_fake_db.commit.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_comments_keyset_pages_and_short_authors(db_session, test_user):
+    post = Post(
+        user_id=test_user.id,
+        title="Commented",
+        description="Keyset",
+        image_url="http://example.com/commented.jpg"
+    )
+    db_session.add(post)
+    await db_session.flush()
+
+    started = datetime.now()
+    for i in range(3):
+        db_session.add(Comment(
+            post_id=post.id,
+            user_id=test_user.id,
+            message=f"comment {i}",
+            created_at=started + timedelta(seconds=i),
+            updated_at=started
+        ))
+    await db_session.commit()
+    db_session.expunge_all()
+
+    repo = CommentRepository(db_session)
+    first_page = await repo.get_comments(post.id, limit=2)
+    rest = await repo.get_comments(
+        post.id, before=(first_page[-1].created_at, first_page[-1].id)
+    )
+
+    assert [c.message for c in first_page] == ["comment 2", "comment 1"]
+    assert [c.message for c in rest] == ["comment 0"]
+
+    # built from selected columns, not from a hydrated User
+    author = first_page[0].user
+    assert isinstance(author, UserShortResponse)
+    assert author.username == test_user.username
+    assert db_session.identity_map.keys() == set()
@@ -3,7 +3,8 @@ from uuid import uuid4
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
 from main import app
-from src.database.models import Comment, User, Role
+from src.core.principal import Principal
+from src.database.models import Comment
 from src.routes.comment import require_role, update_access_dep
 from src.schemas.comment import CommentCreateModel, CommentUpdateRequest
 
@@ -20,13 +21,12 @@ def fake_comment():
 
 @pytest.fixture
 def fake_user():
-    return User(
+    return Principal(
         id=uuid4(),
         username="test_user",
-        roles=[Role(id=1, name="user")],
-        email="test@example.com",
-        password="hashed",
-        status="active"
+        status="active",
+        roles=frozenset({"user"}),
+        permissions=frozenset()
     )
 
 @pytest.fixture(autouse=True)
@@ -91,14 +91,21 @@ def test_get_comments(mock_service_class):
     ]
 
     mock_service = mock_service_class.return_value
-    mock_service.get_comments = AsyncMock(return_value=expected_comments)
+    mock_service.get_comments_page = AsyncMock(return_value=(expected_comments, "next-page"))
+    mock_service.get_comments_page_version = AsyncMock(return_value=[])
 
-    response = client.get(f"/posts/{post_id}/comments")
+    response = client.get(f"/posts/{post_id}/comments", params={"limit": 1})
 
     assert response.status_code == 200
     assert isinstance(response.json(), list)
     assert response.json()[0]["message"] == "Test comment"
-    mock_service.get_comments.assert_awaited_once_with(post_id)
+    assert response.headers["X-Next-Cursor"] == "next-page"
+    mock_service.get_comments_page.assert_awaited_once_with(post_id, 1, None)
+
+def test_get_comments_rejects_oversized_limit():
+    response = client.get(f"/posts/{uuid4()}/comments", params={"limit": 10_000})
+
+    assert response.status_code == 422
 
 @patch("src.routes.comment.CommentService")
 def test_get_comment(mock_service_class):
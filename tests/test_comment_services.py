@@ -1,8 +1,10 @@
 import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 from fastapi import HTTPException
 
+from src.core.pagination import decode_cursor, encode_cursor
 from src.services.comment import CommentService
 from src.schemas.comment import CommentUpdateRequest
 from src.database.models import User
@@ -47,6 +49,33 @@ def test_get_comments(comment_service, mock_repo):
     mock_repo.get_comments.assert_called_once_with(post_id)
 
 
+@pytest.mark.asyncio
+async def test_get_comments_page_returns_cursor(comment_service, mock_repo):
+    post_id = uuid4()
+    comments = [
+        MagicMock(created_at=datetime(2025, 5, 8, 12, i), id=uuid4())
+        for i in (3, 2, 1)
+    ]
+    mock_repo.get_comments = AsyncMock(return_value=comments)
+
+    page, next_cursor = await comment_service.get_comments_page(post_id, limit=2)
+
+    assert page == comments[:2]
+    assert decode_cursor(next_cursor) == (comments[1].created_at, comments[1].id)
+    mock_repo.get_comments.assert_awaited_once_with(post_id, limit=3, before=None)
+
+@pytest.mark.asyncio
+async def test_get_comments_page_last_page(comment_service, mock_repo):
+    post_id = uuid4()
+    cursor = encode_cursor(datetime(2025, 5, 8, 12, 0), uuid4())
+    mock_repo.get_comments = AsyncMock(return_value=["only"])
+
+    page, next_cursor = await comment_service.get_comments_page(post_id, limit=2, cursor=cursor)
+
+    assert page == ["only"]
+    assert next_cursor is None
+    mock_repo.get_comments.assert_awaited_once_with(post_id, limit=3, before=decode_cursor(cursor))
+
 def test_get_comment_success():
     mock_repo = MagicMock()
     mock_repo.get_comment.return_value = "comment1"
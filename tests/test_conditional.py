@@ -0,0 +1,161 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from main import app
+from src.core.conditional import is_not_modified, make_last_modified, validator_headers
+from src.core.response_cache import MemoryCacheBackend, NullCacheBackend, ResponseCache
+from src.database.db import get_session_factory
+from src.database.models import Post
+from src.repositories.rating import RatingRepository
+from src.schemas.post import PostResponse
+from starlette.requests import Request
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+client = TestClient(app)
+
+def http_date(moment: datetime) -> str:
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+def test_validators_change_with_any_version_column():
+    post_id = uuid4()
+    updated_at = datetime(2025, 5, 8, 12, 0, 0)
+
+    base = validator_headers([(post_id, updated_at, 4, 1, updated_at)], last_modified=True)
+    rated = validator_headers([(post_id, updated_at, 9, 2, updated_at)], last_modified=True)
+
+    assert base["ETag"].startswith('W/"')
+    assert base["ETag"] != rated["ETag"]
+    assert base["Last-Modified"] == http_date(updated_at)
+    assert "Last-Modified" not in validator_headers([(post_id, updated_at)])
+
+def test_last_modified_uses_latest_timestamp():
+    rows = [
+        (uuid4(), datetime(2025, 5, 8, 12, 0, 0), datetime(2025, 5, 9, 8, 30, 0)),
+        (uuid4(), datetime(2025, 5, 7, 12, 0, 0), None),
+    ]
+
+    # naive values are local time, converted rather than relabelled as GMT
+    assert make_last_modified(rows) == http_date(datetime(2025, 5, 9, 8, 30, 0))
+    assert make_last_modified([]) is None
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    headers = validator_headers([(uuid4(), datetime(2025, 5, 8, 12, 0, 0))], last_modified=True)
+
+    assert is_not_modified(make_request(if_none_match=f'"other", {headers["ETag"]}'), headers)
+    assert not is_not_modified(
+        make_request(if_none_match='"other"', if_modified_since=headers["Last-Modified"]),
+        headers
+    )
+    assert is_not_modified(make_request(if_modified_since="Fri, 09 May 2025 00:00:00 GMT"), headers)
+    assert not is_not_modified(make_request(if_modified_since="Wed, 07 May 2025 00:00:00 GMT"), headers)
+    assert not is_not_modified(make_request(if_modified_since="not a date"), headers)
+    # RFC 5322 "-0000" parses to a naive datetime, read as UTC
+    assert is_not_modified(make_request(if_modified_since="Sun, 18 Oct 2099 18:33:31 -0000"), headers)
+    assert not is_not_modified(make_request(if_modified_since="Wed, 07 May 2025 00:00:00 -0000"), headers)
+
+@pytest.mark.asyncio
+async def test_get_post_after_rating_ignores_if_modified_since(db_session, test_user):
+    post = Post(user_id=test_user.id, title="Rated", description="d", image_url="http://example.com/r.jpg")
+    db_session.add(post)
+    await db_session.commit()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    transport = ASGITransport(app=app)
+
+    with patch("src.routes.post.response_cache", ResponseCache(NullCacheBackend(), ttl=30)):
+        async with AsyncClient(transport=transport, base_url="http://test") as http:
+            first = await http.get(f"/posts/{post.id}")
+            # a rating moves the counters but no timestamp
+            await RatingRepository(db_session).upsert_rating(post.id, test_user.id, 5)
+            dated = await http.get(
+                f"/posts/{post.id}", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+            )
+            tagged = await http.get(f"/posts/{post.id}", headers={"If-None-Match": first.headers["ETag"]})
+
+    app.dependency_overrides.pop(get_session_factory)
+
+    assert "Last-Modified" not in first.headers
+    assert dated.status_code == 200
+    assert dated.json()["rating_count"] == 1
+    assert tagged.status_code == 200
+
+@patch("src.routes.comment.CommentService")
+def test_get_comments_answers_304_after_version_query(mock_service_class):
+    post_id = uuid4()
+    mock_service = mock_service_class.return_value
+    mock_service.get_comments_page_version = AsyncMock(
+        return_value=[(uuid4(), datetime(2025, 5, 8, 12, 0, 0), datetime(2025, 5, 1, 9, 0, 0))]
+    )
+    mock_service.get_comments_page = AsyncMock(return_value=([], None))
+
+    first = client.get(f"/posts/{post_id}/comments")
+    second = client.get(f"/posts/{post_id}/comments", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert "Last-Modified" not in first.headers
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    mock_service.get_comments_page.assert_awaited_once()
+
+@patch("src.routes.comment.CommentService")
+def test_comment_pages_ignore_if_modified_since(mock_service_class):
+    mock_service = mock_service_class.return_value
+    mock_service.get_comments_page_version = AsyncMock(
+        return_value=[(uuid4(), datetime(2025, 5, 8, 12, 0, 0), datetime(2025, 5, 1, 9, 0, 0))]
+    )
+    mock_service.get_comments_page = AsyncMock(return_value=([], None))
+
+    # a deleted comment leaves the newest timestamp where it was, only the
+    # ETag can tell, so a date alone never earns a 304 on a page
+    response = client.get(
+        f"/posts/{uuid4()}/comments", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}
+    )
+
+    assert response.status_code == 200
+    mock_service.get_comments_page.assert_awaited_once()
+
+@pytest.mark.parametrize("backend", [MemoryCacheBackend(maxsize=8), NullCacheBackend()])
+def test_get_posts_304_with_and_without_cached_body(backend):
+    posts = [PostResponse(id=uuid4(), title="Feed", user_id=uuid4(), image_url="http://example.com/x.jpg")]
+    opened = []
+
+    @asynccontextmanager
+    async def session_factory():
+        opened.append(True)
+        yield None
+
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+    with patch("src.routes.post.response_cache", ResponseCache(backend, ttl=30)), \
+            patch("src.routes.post.PostService") as service_class:
+        service = service_class.return_value
+        service.get_posts_page = AsyncMock(return_value=(posts, None))
+        service.get_posts_page_version = AsyncMock(
+            return_value=[(posts[0].id, datetime(2025, 5, 8, 12, 0, 0), 0, 0, datetime(2025, 5, 1))]
+        )
+
+        first = client.get("/posts/")
+        second = client.get("/posts/", headers={"If-None-Match": first.headers["ETag"]})
+
+    app.dependency_overrides.pop(get_session_factory)
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b""
+    assert "Last-Modified" not in first.headers
+    service.get_posts_page.assert_awaited_once()
+    # with a cached body the 304 is answered without opening a session at all
+    assert len(opened) == (1 if isinstance(backend, MemoryCacheBackend) else 2)
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from main import app
+from sqlalchemy import text
+from src.database.db import DatabaseSessionManager, engine_options
+from unittest.mock import patch
+
+import pytest
+
+def test_engine_options_size_postgres_pool():
+    with patch("src.database.db.settings.DB_POOL_SIZE", 12):
+        options = engine_options("postgresql+asyncpg://user:pass@db:5432/app")
+
+    assert options["pool_size"] == 12
+    assert options["pool_pre_ping"] is True
+    assert "max_overflow" in options and "pool_recycle" in options
+    assert set(options["connect_args"]) == {"statement_cache_size", "command_timeout"}
+
+def test_engine_options_skip_sizing_for_sqlite():
+    options = engine_options("sqlite+aiosqlite:///:memory:")
+
+    assert "pool_size" not in options
+    assert "connect_args" not in options
+
+@pytest.mark.asyncio
+async def test_session_records_pool_wait_and_status():
+    manager = DatabaseSessionManager("sqlite+aiosqlite:///:memory:")
+
+    await manager.warm_up(connections=1)
+    async with manager.session() as session:
+        # the session stays lazy until it sends SQL
+        assert manager.pool_status()["checkouts"] == 0
+
+        await session.execute(text("SELECT 1"))
+        await session.execute(text("SELECT 2"))
+        status = manager.pool_status()
+
+    assert manager.metrics.checkouts == 1
+    assert status["checkouts"] == 1
+    assert status["wait_seconds_max"] >= 0
+    await manager.close()
+
+def test_db_pool_route():
+    response = TestClient(app).get("/health/db-pool")
+
+    assert response.status_code == 200
+    assert "pool_class" in response.json()
@@ -3,18 +3,28 @@ from uuid import uuid4
 from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.dependencies import can_update_account, user_has_access_to_comment
-from src.database.models import Comment, Post, Role, User
-from src.core.dependencies import user_has_access
+from src.core.principal import Principal
+from src.database.models import Comment, Post, User
+from src.core.dependencies import post_write_owner, require_permission, user_has_access
 
 import pytest
 
+def make_principal(user_id, roles=(), permissions=()):
+    return Principal(
+        id=user_id,
+        username="tester",
+        status="active",
+        roles=frozenset(roles),
+        permissions=frozenset(permissions),
+    )
+
 @pytest.mark.asyncio
 async def test_user_has_access_as_author():
     post_id = uuid4()
     user_id = uuid4()
     post = Post(id=post_id, user_id=user_id)
 
-    user = User(id=user_id, roles=[])
+    user = make_principal(user_id)
 
     db = AsyncMock(spec=AsyncSession)
     result_mock = MagicMock()
@@ -30,7 +40,7 @@ async def test_user_has_access_as_author():
 async def test_user_has_access_forbidden():
     post_id = uuid4()
     post = Post(id=post_id, user_id=uuid4())
-    user = User(id=uuid4(), roles=[])
+    user = make_principal(uuid4())
 
     db = AsyncMock()
     result_mock = MagicMock()
@@ -44,6 +54,16 @@ async def test_user_has_access_forbidden():
 
     assert exc_info.value.status_code == 403
 
+@pytest.mark.asyncio
+async def test_post_write_owner_scopes_plain_users_to_own_posts():
+    user_id = uuid4()
+    checker = post_write_owner("update").dependency
+
+    assert await checker(user=make_principal(user_id, roles=("user",))) == user_id
+    assert await checker(user=make_principal(user_id, roles=("moderator",))) is None
+    assert await checker(user=make_principal(user_id, permissions=("update_all_posts",))) is None
+    assert await checker(user=make_principal(user_id, permissions=("delete_all_posts",))) == user_id
+
 @pytest.mark.asyncio
 async def test_user_has_access_to_comment_as_author():
     # Setup
@@ -51,7 +71,7 @@ async def test_user_has_access_to_comment_as_author():
     user_id = uuid4()
     comment = Comment(id=comment_id, user_id=user_id)
 
-    user = User(id=user_id, roles=[])
+    user = make_principal(user_id)
 
     db = AsyncMock(spec=AsyncSession)
     result_mock = MagicMock()
@@ -67,7 +87,7 @@ async def test_user_has_access_to_comment_as_author():
 @pytest.mark.asyncio
 async def test_can_update_own_account():
     user_id = uuid4()
-    user = User(id=user_id, roles=[])
+    user = make_principal(user_id)
     account = User(id=user_id)
 
     db = AsyncMock()
@@ -84,7 +104,7 @@ async def test_can_update_own_account():
 @pytest.mark.asyncio
 async def test_can_update_account_as_admin():
     account_id = uuid4()
-    user = User(id=uuid4(), roles=[Role(name="admin")])
+    user = make_principal(uuid4(), roles={"admin"})
     account = User(id=account_id)
 
     db = AsyncMock()
@@ -105,7 +125,7 @@ async def test_can_update_account_not_found():
     result_mock.scalar_one_or_none.return_value = None
     db.execute.return_value = result_mock
 
-    user = User(id=uuid4(), roles=[])
+    user = make_principal(uuid4())
 
     checker = can_update_account().dependency
 
@@ -117,7 +137,7 @@ async def test_can_update_account_not_found():
 @pytest.mark.asyncio
 async def test_can_update_account_forbidden():
     account_id = uuid4()
-    user = User(id=uuid4(), roles=[])
+    user = make_principal(uuid4())
     account = User(id=account_id)
 
     db = AsyncMock()
@@ -131,3 +151,29 @@ async def test_can_update_account_forbidden():
         await checker(account_id=account_id, db=db, user=user)
 
     assert exc_info.value.status_code == 403
+
+@pytest.mark.asyncio
+async def test_user_has_access_with_permission():
+    post_id = uuid4()
+    post = Post(id=post_id, user_id=uuid4())
+    user = make_principal(uuid4(), roles={"user"}, permissions={"delete_all_posts"})
+
+    db = AsyncMock()
+    result_mock = MagicMock()
+    result_mock.scalar_one_or_none.return_value = post
+    db.execute.return_value = result_mock
+
+    checker = user_has_access("delete").dependency
+
+    assert await checker(post_id=post_id, db=db, user=user) == post
+
+@pytest.mark.asyncio
+async def test_require_permission_denied():
+    user = make_principal(uuid4(), roles={"user"}, permissions={"update_all_comments"})
+
+    checker = require_permission("delete_all_comments").dependency
+
+    with pytest.raises(HTTPException) as exc_info:
+        await checker(user=user)
+
+    assert exc_info.value.status_code == 403
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.database.models import (
+    Base, Comment, Post, PostRating, PostTag, Tag, User, UserStatusEnum, recount_post_ratings_stmt
+)
+from src.repositories.comment import CommentRepository
+from src.repositories.post import PostRepository
+from src.repositories.tag import TagRepository
+from src.repositories.user import UserRepository
+from uuid import uuid4
+
+import pytest
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+HOT_TABLES = ("posts", "comments", "post_ratings", "post_tags", "refresh_tokens")
+
+@pytest.fixture(scope="module")
+async def seeded():
+    engine = create_async_engine(DATABASE_URL, poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with session_factory() as session:
+        users = [
+            User(
+                id=uuid4(),
+                username=f"indexed{i}",
+                email=f"indexed{i}@example.com",
+                password="x",
+                status=UserStatusEnum.active
+            )
+            for i in range(3)
+        ]
+        session.add_all(users)
+        session.add(Tag(name="nature"))
+
+        now = datetime.now()
+        posts = []
+        for i in range(30):
+            post = Post(
+                id=uuid4(),
+                user_id=users[i % 3].id,
+                title=f"post {i}",
+                description="d",
+                image_url="http://example.com/i.jpg",
+                created_at=now - timedelta(minutes=i),
+                updated_at=now
+            )
+            posts.append(post)
+            session.add(post)
+            session.add(PostTag(post_id=post.id, tag_name="nature", created_at=post.created_at))
+            session.add(Comment(user_id=users[0].id, post_id=post.id, message="c", created_at=now))
+        await session.flush()
+        session.add(PostRating(user_id=users[1].id, post_id=posts[0].id, rating=4))
+        await session.commit()
+
+    yield engine, session_factory, users, posts
+    await engine.dispose()
+
+async def capture_plans(engine, session_factory, call):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with session_factory() as session:
+            await call(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.extend(row[-1] for row in result.all())
+
+    return plans
+
+def full_scans(plans):
+    # "SCAN posts" without "USING ... INDEX" means every row is read
+    return [
+        line for line in plans
+        if line.startswith("SCAN ")
+        and line.split()[1] in HOT_TABLES
+        and "USING" not in line
+    ]
+
+@pytest.mark.asyncio
+async def test_comments_by_post_use_index(seeded):
+    engine, session_factory, users, posts = seeded
+
+    plans = await capture_plans(
+        engine, session_factory,
+        lambda session: CommentRepository(session).get_comments(posts[3].id)
+    )
+
+    assert plans
+    assert full_scans(plans) == []
+
+@pytest.mark.asyncio
+async def test_feed_and_post_lookup_use_index(seeded):
+    engine, session_factory, users, posts = seeded
+
+    async def call(session):
+        repo = PostRepository(session)
+        await repo.get_posts(limit=10, after=(posts[5].created_at, posts[5].id))
+        await repo.get_post(posts[7].id)
+
+    plans = await capture_plans(engine, session_factory, call)
+
+    assert any("post_tags" in line for line in plans)
+    assert full_scans(plans) == []
+
+@pytest.mark.asyncio
+async def test_profile_counts_use_user_indexes(seeded):
+    engine, session_factory, users, posts = seeded
+
+    plans = await capture_plans(
+        engine, session_factory,
+        lambda session: UserRepository(session).get_user_profile_by_username(users[1].username)
+    )
+
+    assert full_scans(plans) == []
+
+@pytest.mark.asyncio
+async def test_rating_recount_uses_post_id_index(seeded):
+    engine, session_factory, users, posts = seeded
+
+    async def call(session):
+        await session.execute(recount_post_ratings_stmt(posts[0].id))
+        await session.rollback()
+
+    plans = await capture_plans(engine, session_factory, call)
+
+    assert any("post_ratings" in line for line in plans)
+    assert full_scans(plans) == []
+
+@pytest.mark.asyncio
+async def test_tag_page_is_read_off_the_tag_index(seeded):
+    engine, session_factory, users, posts = seeded
+
+    plans = await capture_plans(
+        engine, session_factory,
+        lambda session: TagRepository(session).get_tag_posts(
+            "nature", limit=10, after=(posts[5].created_at, posts[5].id)
+        )
+    )
+
+    assert any("ix_post_tags_tag_name_created_at_post_id" in line for line in plans)
+    assert not any("TEMP B-TREE" in line for line in plans)
+    assert full_scans(plans) == []
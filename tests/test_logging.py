@@ -0,0 +1,69 @@
+from io import StringIO
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+from src.services.utils import JsonFormatter, RecordQueueHandler, SamplingFilter, listener, logger
+
+import json, logging, sys
+
+def make_record(level=logging.INFO, msg="user %s logged in", args=("alice",), exc_info=None):
+    return logging.LogRecord("src.test", level, __file__, 1, msg, args, exc_info)
+
+def test_json_formatter_writes_one_object_per_line():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(level=logging.ERROR, exc_info=sys.exc_info())
+
+    line = JsonFormatter().format(record)
+    entry = json.loads(line)
+
+    assert "\n" not in line
+    assert (entry["level"], entry["logger"], entry["message"]) == ("ERROR", "src.test", "user alice logged in")
+    assert "ValueError: boom" in entry["exc_info"]
+
+def test_traceback_survives_the_queue():
+    stream = StringIO()
+    written = logging.StreamHandler(stream)
+    written.setFormatter(JsonFormatter())
+    queue = SimpleQueue()
+    queued = logging.getLogger("src.test.queued")
+    queued.addHandler(RecordQueueHandler(queue))
+    queued.propagate = False
+    queue_listener = QueueListener(queue, written)
+    queue_listener.start()
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        queued.exception("upload %s failed", "cat.jpg")
+    queue_listener.stop()
+
+    entry = json.loads(stream.getvalue())
+
+    assert entry["message"] == "upload cat.jpg failed"
+    assert "ValueError: boom" in entry["exc_info"]
+
+def test_sampling_filter_only_thins_debug():
+    dropping = SamplingFilter(debug_rate=0.0)
+    keeping = SamplingFilter(debug_rate=1.0)
+
+    assert dropping.filter(make_record(level=logging.DEBUG)) is False
+    assert dropping.filter(make_record(level=logging.INFO)) is True
+    assert keeping.filter(make_record(level=logging.DEBUG)) is True
+
+def test_logger_only_enqueues():
+    # file writes happen on the listener thread, never in the caller
+    assert [type(handler) for handler in logger.handlers] == [RecordQueueHandler]
+    assert all(isinstance(handler, logging.FileHandler) for handler in listener.handlers)
+
+def test_disabled_calls_never_format_their_arguments():
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("formatted")
+
+    level = logger.level
+    logger.setLevel(logging.INFO)
+    try:
+        logger.debug("state %s", Expensive())
+    finally:
+        logger.setLevel(level)
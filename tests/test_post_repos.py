@@ -1,10 +1,12 @@
 from datetime import datetime
 from fastapi import HTTPException
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import Update
 from uuid import uuid4
 from datetime import datetime
-from src.database.models import Base, User
+from src.database.models import Base, Post, PostRating, User, recount_post_ratings_stmt
 from src.repositories.post import PostRepository
 from src.schemas.post import PostCreateModel
 from src.schemas.tag import TagsShortResponse
@@ -43,6 +45,39 @@ async def test_create_post(db_session: AsyncSession, test_user: User):
 
     assert post.image_url == "http://example.com/image.jpg"
 
+@pytest.mark.asyncio
+async def test_create_post_batches_tag_writes(db_session: AsyncSession, test_user: User, db_engine):
+    repo = PostRepository(db_session)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def create_with(names):
+        statements.clear()
+        post_data = PostCreateModel(
+            title="Tagged",
+            description="Batch",
+            image_url="http://example.com/tagged.jpg",
+            tags=[TagsShortResponse(name=name) for name in names]
+        )
+        return await repo.create(post_data, test_user)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await create_with(["batch-one"])
+        single_tag_statements = len(statements)
+
+        # "batch-one" already exists and "batch-two" is repeated
+        post = await create_with(["batch-one", "batch-two", "batch-two", "batch-three"])
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+    assert len(statements) == single_tag_statements
+
+    result = await repo.get_post(post.id)
+    assert sorted(tag.name for tag in result.tags) == ["batch-one", "batch-three", "batch-two"]
+
 @pytest.mark.asyncio
 async def test_get_post(db_session: AsyncSession, test_user: User):
     repo = PostRepository(db_session)
@@ -65,7 +100,7 @@ async def test_get_post_not_found(async_fake_db):
     post_id = uuid4()
 
     result_mock = MagicMock()
-    result_mock.scalar_one_or_none.return_value = None
+    result_mock.first.return_value = None
     async_fake_db.execute = AsyncMock(return_value=result_mock)
 
     repo = PostRepository(async_fake_db)
@@ -116,3 +151,174 @@ async def test_delete_post(db_session: AsyncSession, test_user: User):
     deleted = await repo.delete_post(post.id)
 
     assert deleted is True
+
+@pytest.mark.asyncio
+async def test_get_posts_keyset_pagination(db_session: AsyncSession, test_user: User):
+    repo = PostRepository(db_session)
+
+    for i in range(3):
+        post_data = PostCreateModel(
+            title=f"Paged {i}",
+            description="paged",
+            image_url="http://paged.jpg",
+            tags=[]
+        )
+        await repo.create(post_data, test_user)
+
+    all_posts = await repo.get_posts()
+    first_page = await repo.get_posts(limit=2)
+    last = first_page[-1]
+    second_page = await repo.get_posts(limit=2, after=(last.created_at, last.id))
+
+    assert len(first_page) == 2
+    assert [p.id for p in first_page + second_page] == [p.id for p in all_posts[:4]]
+
+@pytest.mark.asyncio
+async def test_get_post_rating_stats(db_session: AsyncSession, test_user: User):
+    repo = PostRepository(db_session)
+
+    post_data = PostCreateModel(
+        title="Rated",
+        description="rated post",
+        image_url="http://rated.jpg",
+        tags=[]
+    )
+    post = await repo.create(post_data, test_user)
+
+    unrated = await repo.get_post(post.id)
+    assert unrated.avg_rating is None
+    assert unrated.rating_count == 0
+
+    for rating in (5, 4, 4):
+        rater = User(
+            id=uuid4(),
+            username=f"rater_{uuid4().hex[:8]}",
+            email=f"rater_{uuid4().hex[:8]}@example.com",
+            password="hashed",
+            status="active"
+        )
+        db_session.add(rater)
+        db_session.add(PostRating(user_id=rater.id, post_id=post.id, rating=rating))
+    await db_session.commit()
+
+    rated = await repo.get_post(post.id)
+
+    assert rated.avg_rating == 4.33
+    assert rated.rating_count == 3
+
+@pytest.mark.asyncio
+async def test_rating_counters_follow_rating_writes(db_session: AsyncSession, test_user: User):
+    repo = PostRepository(db_session)
+
+    post_data = PostCreateModel(
+        title="Counters",
+        description="counted post",
+        image_url="http://counted.jpg",
+        tags=[]
+    )
+    post = await repo.create(post_data, test_user)
+
+    rating = PostRating(user_id=test_user.id, post_id=post.id, rating=2)
+    db_session.add(rating)
+    await db_session.commit()
+
+    rating.rating = 5
+    await db_session.commit()
+
+    updated = await repo.get_post(post.id)
+    assert (updated.avg_rating, updated.rating_count) == (5, 1)
+
+    await db_session.delete(rating)
+    await db_session.commit()
+
+    deleted = await repo.get_post(post.id)
+    assert (deleted.avg_rating, deleted.rating_count) == (None, 0)
+
+@pytest.mark.asyncio
+async def test_recount_post_ratings_backfills_drifted_counters(db_session: AsyncSession, test_user: User):
+    repo = PostRepository(db_session)
+
+    post_data = PostCreateModel(
+        title="Drifted",
+        description="drifted counters",
+        image_url="http://drifted.jpg",
+        tags=[]
+    )
+    post = await repo.create(post_data, test_user)
+
+    db_session.add(PostRating(user_id=test_user.id, post_id=post.id, rating=3))
+    await db_session.commit()
+
+    await db_session.execute(
+        Update(Post).where(Post.id == post.id).values(rating_sum=0, rating_count=0)
+    )
+    await db_session.execute(recount_post_ratings_stmt(post.id))
+    await db_session.commit()
+
+    result = await repo.get_post(post.id)
+    assert (result.avg_rating, result.rating_count) == (3, 1)
+
+@pytest.mark.asyncio
+async def test_post_version_tracks_updates(db_session: AsyncSession, test_user: User):
+    repo = PostRepository(db_session)
+
+    post_data = PostCreateModel(
+        title="Versioned",
+        description="Before",
+        image_url="http://example.com/versioned.jpg",
+        tags=[]
+    )
+    post = await repo.create(post_data, test_user)
+
+    before = await repo.get_post_version(post.id)
+    feed_before = await repo.get_posts_version(limit=1)
+    time.sleep(0.001)
+    await repo.update_post(post.id, "After")
+    after = await repo.get_post_version(post.id)
+
+    assert feed_before[0] == before[0]
+    assert before[0].id == after[0].id == post.id
+    assert after[0].updated_at > before[0].updated_at
+
+@pytest.mark.asyncio
+async def test_conditional_writes_check_ownership_in_the_statement(db_session: AsyncSession, test_user: User, db_engine):
+    repo = PostRepository(db_session)
+
+    post_data = PostCreateModel(
+        title="Owned",
+        description="Original",
+        image_url="http://example.com/owned.jpg",
+        tags=[TagsShortResponse(name="owned")]
+    )
+    post = await repo.create(post_data, test_user)
+
+    with pytest.raises(HTTPException) as forbidden:
+        await repo.update_post(post.id, "Hijacked", owner_id=uuid4())
+    with pytest.raises(HTTPException) as missing:
+        await repo.update_post(uuid4(), "Nothing", owner_id=test_user.id)
+    with pytest.raises(HTTPException) as forbidden_delete:
+        await repo.delete_post(post.id, owner_id=uuid4())
+
+    assert forbidden.value.status_code == 403
+    assert missing.value.status_code == 404
+    assert forbidden_delete.value.status_code == 403
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        updated = await repo.update_post(post.id, "Edited", owner_id=test_user.id)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+    # the UPDATE returns the row, only the tags are read afterwards
+    assert statements == ["UPDATE", "SELECT"]
+    assert updated.description == "Edited"
+    assert updated.user.username == test_user.username
+    assert [tag.name for tag in updated.tags] == ["owned"]
+
+    assert await repo.delete_post(post.id, owner_id=test_user.id) is True
+    assert await repo.delete_post(post.id) is False
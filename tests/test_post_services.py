@@ -1,7 +1,11 @@
 import pytest
+from base64 import urlsafe_b64encode
+from datetime import datetime
+from fastapi import HTTPException
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
+from src.core.pagination import decode_cursor, encode_cursor
 from src.services.post import PostService
 from src.database.models import User
 
@@ -48,7 +52,7 @@ async def test_update_post():
 
     result = await service.update_post(mock_post_id, "updated")
     assert result["description"] == "updated"
-    mock_repo.update_post.assert_awaited_once_with(mock_post_id, "updated")
+    mock_repo.update_post.assert_awaited_once_with(mock_post_id, "updated", owner_id=None)
 
 @pytest.mark.asyncio
 async def test_get_all_posts():
@@ -59,3 +63,50 @@ async def test_get_all_posts():
     result = await service.get_all_posts()
     assert len(result) == 2
     mock_repo.get_posts.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_get_posts_page_returns_next_cursor():
+    posts = [
+        MagicMock(id=uuid4(), created_at=datetime(2025, 5, 1, 12, 0, i))
+        for i in range(3)
+    ]
+    mock_repo = MagicMock()
+    mock_repo.get_posts = AsyncMock(return_value=posts)
+    service = PostService(mock_repo)
+
+    page, next_cursor = await service.get_posts_page(limit=2)
+
+    assert page == posts[:2]
+    assert decode_cursor(next_cursor) == (posts[1].created_at, posts[1].id)
+    mock_repo.get_posts.assert_awaited_once_with(limit=3, after=None)
+
+@pytest.mark.asyncio
+async def test_get_posts_page_last_page():
+    mock_repo = MagicMock()
+    mock_repo.get_posts = AsyncMock(return_value=[MagicMock(id=uuid4())])
+    service = PostService(mock_repo)
+
+    cursor = encode_cursor(datetime(2025, 5, 1), uuid4())
+    page, next_cursor = await service.get_posts_page(limit=2, cursor=cursor)
+
+    assert len(page) == 1
+    assert next_cursor is None
+
+@pytest.mark.asyncio
+async def test_get_posts_page_invalid_cursor():
+    service = PostService(MagicMock())
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.get_posts_page(limit=2, cursor="not-a-cursor")
+
+    assert exc_info.value.status_code == 400
+
+def test_decode_cursor_rejects_timezone_aware_timestamps():
+    raw = f"2020-01-01T00:00:00+05:00|{uuid4()}"
+    cursor = urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid cursor"
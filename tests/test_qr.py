@@ -1,7 +1,12 @@
 import pytest
 import base64
 
+from fastapi.testclient import TestClient
+from main import app
+from src.core.principal import Principal
+from src.services.auth import get_claims_principal
 from src.services.qr import QrCodeService  # Adjust the import path if needed
+from uuid import uuid4
 
 def test_generate_qr_code():
     # Given
@@ -22,3 +27,59 @@ def test_generate_qr_code():
         base64.b64decode(base64_part)
     except Exception:
         pytest.fail("QR code base64 decoding failed")
+
+def test_render_is_cached_per_url_and_options():
+    first = QrCodeService.render("https://example.com/cached", "png", 4, 2)
+    second = QrCodeService.render("https://example.com/cached", "png", 4, 2)
+    other = QrCodeService.render("https://example.com/cached", "png", 5, 2)
+
+    assert first is second
+    assert other != first
+    assert first.startswith(b"\x89PNG")
+
+def test_render_svg_skips_raster_encoding():
+    image = QrCodeService.render("https://example.com/svg", "svg")
+
+    assert b"<svg" in image
+    assert QrCodeService.etag("https://example.com/svg", "svg") != QrCodeService.etag("https://example.com/svg", "png")
+
+@pytest.mark.asyncio
+async def test_render_async_runs_off_loop():
+    image = await QrCodeService.render_async("https://example.com/async", "png")
+
+    assert image == QrCodeService.render("https://example.com/async", "png")
+
+@pytest.fixture
+def qr_client():
+    app.dependency_overrides[get_claims_principal] = lambda: Principal(
+        id=uuid4(),
+        username="tester",
+        status="active",
+        roles=frozenset({"user"}),
+        permissions=frozenset()
+    )
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def test_qr_route_returns_raw_png_with_validators(qr_client):
+    response = qr_client.post("/posts/generate-qr-code", json={"url": "https://example.com", "output": "png"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"] == "private, max-age=86400"
+    assert response.content.startswith(b"\x89PNG")
+
+    cached = qr_client.post(
+        "/posts/generate-qr-code",
+        json={"url": "https://example.com", "output": "png"},
+        headers={"If-None-Match": response.headers["etag"]}
+    )
+
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+def test_qr_route_keeps_data_uri_default(qr_client):
+    response = qr_client.post("/posts/generate-qr-code", json={"url": "https://example.com"})
+
+    assert response.status_code == 200
+    assert response.json()["qr_code"].startswith("data:image/png;base64,")
@@ -0,0 +1,302 @@
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.core.principal import Principal
+from src.core.security import security
+from src.database.models import (
+    Base, Comment, Post, PostRating, PostTag, RefreshToken, Role, Tag, User, UserStatusEnum
+)
+from src.repositories.auth import AuthRepository
+from src.repositories.comment import CommentRepository
+from src.repositories.post import PostRepository
+from src.repositories.rating import RatingRepository
+from src.repositories.refresh_token import RefreshTokenRepository
+from src.repositories.role import RoleRepository
+from src.repositories.tag import TagRepository
+from src.repositories.user import UserRepository
+from src.schemas.comment import CommentCreateModel
+from src.schemas.post import PostCreateModel, TagModel
+from src.schemas.user import UserCreate, UserUpdateRequest, UserUpdateStatusRequest
+from types import SimpleNamespace
+from uuid import uuid4
+
+import inspect, pytest
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+REPOSITORIES = (
+    AuthRepository, CommentRepository, PostRepository, RatingRepository,
+    RefreshTokenRepository, RoleRepository, TagRepository, UserRepository
+)
+
+# "Repository.method" or "Repository.method[case]" -> (most statements one
+# call may send, the call); a case names another hot path of the same method.
+# Budgets are what the method costs today on SQLite; raise one only together
+# with the change that needs it, a higher count on an unchanged method is an N+1.
+QUERY_BUDGETS = {}
+
+def budget(name, max_statements):
+    def register(call):
+        QUERY_BUDGETS[name] = (max_statements, call)
+        return call
+    return register
+
+@pytest.fixture
+async def seeded():
+    # a fresh database per case, so write budgets never depend on test order
+    engine = create_async_engine(DATABASE_URL, poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with session_factory() as session:
+        author, reader = [
+            User(
+                id=uuid4(),
+                username=f"counted{i}",
+                email=f"counted{i}@example.com",
+                password="x",
+                status=UserStatusEnum.active
+            )
+            for i in range(2)
+        ]
+        author.roles = [Role(name="user")]
+        session.add_all([author, reader, Role(name="moderator"), Tag(name="nature")])
+
+        now = datetime.now()
+        posts = []
+        for i in range(5):
+            post = Post(
+                id=uuid4(),
+                user_id=author.id,
+                title=f"counted nature {i}",
+                description="d",
+                image_url="http://example.com/i.jpg",
+                created_at=now - timedelta(minutes=i),
+                updated_at=now
+            )
+            posts.append(post)
+            session.add(post)
+            session.add(PostTag(post_id=post.id, tag_name="nature", created_at=post.created_at))
+            for _ in range(3):
+                session.add(Comment(user_id=reader.id, post_id=post.id, message="c", created_at=now))
+        await session.flush()
+
+        comment = Comment(user_id=reader.id, post_id=posts[0].id, message="mine", created_at=now)
+        session.add_all([
+            comment,
+            PostRating(user_id=reader.id, post_id=posts[0].id, rating=4),
+            RefreshToken(
+                user_id=author.id,
+                token=security.hash_token("live-token"),
+                family_id=uuid4(),
+                created_at=now,
+                expires_at=now + timedelta(days=1)
+            ),
+            RefreshToken(
+                user_id=author.id,
+                token=security.hash_token("expired-token"),
+                family_id=uuid4(),
+                created_at=now - timedelta(days=2),
+                expires_at=now - timedelta(days=1)
+            )
+        ])
+        await session.commit()
+
+    yield engine, session_factory, SimpleNamespace(
+        author=author, reader=reader, posts=posts, comment=comment
+    )
+    await engine.dispose()
+
+def principal(user):
+    return Principal(
+        id=user.id, username=user.username, status="active",
+        roles=frozenset({"user"}), permissions=frozenset()
+    )
+
+@budget("AuthRepository.create_user", 9)
+async def _(session, seed):
+    await AuthRepository(session).create_user(
+        UserCreate(username="newcomer", email="newcomer@example.com", password="secret"), "user"
+    )
+
+@budget("AuthRepository.create_user_roles", 4)
+async def _(session, seed):
+    await AuthRepository(session).create_user_roles(User(username="roled"), "user")
+
+@budget("CommentRepository.add_comment", 4)
+async def _(session, seed):
+    await CommentRepository(session).add_comment(
+        seed.posts[1].id, seed.reader.id, CommentCreateModel(message="hello")
+    )
+
+@budget("CommentRepository.get_comments", 1)
+async def _(session, seed):
+    await CommentRepository(session).get_comments(seed.posts[0].id, limit=10)
+
+@budget("CommentRepository.get_comments_version", 1)
+async def _(session, seed):
+    await CommentRepository(session).get_comments_version(seed.posts[0].id, limit=10)
+
+@budget("CommentRepository.get_comment", 2)
+async def _(session, seed):
+    await CommentRepository(session).get_comment(seed.comment.id)
+
+@budget("CommentRepository.update", 3)
+async def _(session, seed):
+    await CommentRepository(session).update(seed.comment.id, "edited")
+
+@budget("CommentRepository.delete", 3)
+async def _(session, seed):
+    await CommentRepository(session).delete(seed.comment.id)
+
+@budget("PostRepository.create", 3)
+async def _(session, seed):
+    await PostRepository(session).create(
+        PostCreateModel(
+            title="new",
+            description="d",
+            image_url="http://example.com/new.jpg",
+            tags=[TagModel(name="nature"), TagModel(name="city"), TagModel(name="night")]
+        ),
+        principal(seed.author)
+    )
+
+@budget("PostRepository.delete_post", 2)
+async def _(session, seed):
+    await PostRepository(session).delete_post(seed.posts[1].id, seed.author.id)
+
+@budget("PostRepository.get_post", 2)
+async def _(session, seed):
+    await PostRepository(session).get_post(seed.posts[0].id)
+
+@budget("PostRepository.update_post", 2)
+async def _(session, seed):
+    await PostRepository(session).update_post(seed.posts[0].id, "edited", seed.author.id)
+
+@budget("PostRepository.get_post_version", 1)
+async def _(session, seed):
+    await PostRepository(session).get_post_version(seed.posts[0].id)
+
+@budget("PostRepository.get_posts", 2)
+async def _(session, seed):
+    await PostRepository(session).get_posts(limit=10)
+
+@budget("PostRepository.get_posts_version", 1)
+async def _(session, seed):
+    await PostRepository(session).get_posts_version(limit=10)
+
+@budget("PostRepository.search_posts", 2)
+async def _(session, seed):
+    await PostRepository(session).search_posts("nature", limit=10)
+
+@budget("RatingRepository.upsert_rating", 2)
+async def _(session, seed):
+    await RatingRepository(session).upsert_rating(seed.posts[0].id, seed.author.id, 5)
+
+# the reader already rated posts[0]: insert skipped, previous rating locked,
+# rating updated, counters shifted
+@budget("RatingRepository.upsert_rating[re-rate]", 4)
+async def _(session, seed):
+    await RatingRepository(session).upsert_rating(seed.posts[0].id, seed.reader.id, 2)
+
+@budget("RefreshTokenRepository.add", 1)
+async def _(session, seed):
+    await RefreshTokenRepository(session).add(seed.author.id, "fresh-token")
+
+@budget("RefreshTokenRepository.rotate", 1)
+async def _(session, seed):
+    await RefreshTokenRepository(session).rotate("live-token")
+
+@budget("RefreshTokenRepository.revoke_family", 1)
+async def _(session, seed):
+    await RefreshTokenRepository(session).revoke_family(uuid4())
+
+@budget("RefreshTokenRepository.purge_expired", 1)
+async def _(session, seed):
+    await RefreshTokenRepository(session).purge_expired(100)
+
+@budget("RoleRepository.get_default_permissions", 0)
+async def _(session, seed):
+    await RoleRepository(session).get_default_permissions()
+
+@budget("RoleRepository.get_role_by_name", 2)
+async def _(session, seed):
+    await RoleRepository(session).get_role_by_name("user")
+
+@budget("RoleRepository.create_role", 2)
+async def _(session, seed):
+    await RoleRepository(session).create_role("user")
+
+# four round trips per granted permission, the loop is the cost to watch
+@budget("RoleRepository.create_role_permissions", 14)
+async def _(session, seed):
+    await RoleRepository(session).create_role_permissions("moderator")
+
+@budget("TagRepository.tag_exists", 1)
+async def _(session, seed):
+    await TagRepository(session).tag_exists("nature")
+
+@budget("TagRepository.get_tag_posts", 2)
+async def _(session, seed):
+    await TagRepository(session).get_tag_posts("nature", limit=10)
+
+@budget("TagRepository.suggest_tags", 1)
+async def _(session, seed):
+    await TagRepository(session).suggest_tags("nat", limit=10)
+
+@budget("UserRepository.get_user_profile_by_username", 2)
+async def _(session, seed):
+    await UserRepository(session).get_user_profile_by_username(seed.author.username)
+
+@budget("UserRepository.get_user_account", 3)
+async def _(session, seed):
+    await UserRepository(session).get_user_account(seed.author.id)
+
+@budget("UserRepository.update_user", 3)
+async def _(session, seed):
+    await UserRepository(session).update_user(
+        seed.reader.id,
+        UserUpdateRequest(
+            username="renamed", first_name=None, last_name=None,
+            email="renamed@example.com", img_link=None, phone=None
+        )
+    )
+
+@budget("UserRepository.update_user_status", 3)
+async def _(session, seed):
+    await UserRepository(session).update_user_status(
+        seed.reader.id, UserUpdateStatusRequest(status=UserStatusEnum.ban)
+    )
+
+@budget("UserRepository.get_all_users", 3)
+async def _(session, seed):
+    await UserRepository(session).get_all_users()
+
+def test_every_repository_method_has_a_budget():
+    methods = {
+        f"{repository.__name__}.{name}"
+        for repository in REPOSITORIES
+        for name, member in vars(repository).items()
+        if inspect.iscoroutinefunction(member) and not name.startswith("_")
+    }
+
+    budgeted = {name.split("[")[0] for name in QUERY_BUDGETS}
+
+    assert methods - budgeted == set()
+    assert budgeted - methods == set()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(QUERY_BUDGETS))
+async def test_repository_query_budget(name, seeded, count_queries):
+    engine, session_factory, seed = seeded
+    max_statements, call = QUERY_BUDGETS[name]
+
+    async with session_factory() as session:
+        with count_queries(engine) as statements:
+            await call(session, seed)
+
+    assert len(statements) <= max_statements, (
+        f"{name} sent {len(statements)} statements, budget is {max_statements}:\n"
+        + "\n".join(statements)
+    )
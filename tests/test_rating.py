@@ -0,0 +1,110 @@
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from main import app
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from src.core.principal import Principal
+from src.database.models import Post, User, UserStatusEnum
+from src.repositories.post import PostRepository
+from src.repositories.rating import RatingRepository
+from src.schemas.rating import RatingResponse
+from src.services.auth import get_current_user
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+async def make_post(db_session, author):
+    post = Post(
+        user_id=author.id,
+        title="Rated",
+        description="Stars",
+        image_url="http://example.com/rated.jpg"
+    )
+    db_session.add(post)
+    await db_session.commit()
+    return post
+
+async def make_rater(db_session):
+    name = f"rater_{uuid4().hex[:8]}"
+    rater = User(username=name, email=f"{name}@example.com", password="x", status=UserStatusEnum.active)
+    db_session.add(rater)
+    await db_session.commit()
+    return rater
+
+@pytest.mark.asyncio
+async def test_upsert_rating_inserts_then_updates(db_session, test_user):
+    post = await make_post(db_session, test_user)
+    other = await make_rater(db_session)
+    repo = RatingRepository(db_session)
+
+    first = await repo.upsert_rating(post.id, test_user.id, 4)
+    second = await repo.upsert_rating(post.id, other.id, 2)
+    changed = await repo.upsert_rating(post.id, test_user.id, 5)
+
+    assert (first.created, first.rating_count, first.avg_rating) == (True, 1, 4.0)
+    assert (second.created, second.rating_count, second.avg_rating) == (True, 2, 3.0)
+    assert (changed.created, changed.rating, changed.rating_count, changed.avg_rating) == (False, 5, 2, 3.5)
+
+    # counters on the post agree with what the upsert returned
+    stored = await PostRepository(db_session).get_post(post.id)
+    assert (stored.rating_count, stored.avg_rating) == (2, 3.5)
+
+@pytest.mark.asyncio
+async def test_upsert_rating_unknown_post(db_session, test_user):
+    with pytest.raises(HTTPException) as exc_info:
+        await RatingRepository(db_session).upsert_rating(uuid4(), test_user.id, 3)
+
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_rerate_shifts_post_counters_by_the_delta(db_session, test_user):
+    post = await make_post(db_session, test_user)
+    repo = RatingRepository(db_session)
+
+    async def counters():
+        result = await db_session.execute(
+            select(Post.rating_sum, Post.rating_count).where(Post.id == post.id)
+        )
+        return tuple(result.one())
+
+    await repo.upsert_rating(post.id, test_user.id, 3)
+    assert await counters() == (3, 1)
+
+    # the previous rating is replaced, not added on top
+    await repo.upsert_rating(post.id, test_user.id, 5)
+    await repo.upsert_rating(post.id, test_user.id, 5)
+    assert await counters() == (5, 1)
+
+def test_postgresql_previous_rating_is_read_under_lock():
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    repo = RatingRepository(db)
+
+    insert_sql = str(repo._insert_ignoring_conflict(uuid4(), uuid4(), 4).compile(dialect=postgresql.dialect()))
+    lock_sql = str(repo._previous_rating_stmt(uuid4(), uuid4()).compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (user_id, post_id) DO NOTHING RETURNING post_ratings.id" in insert_sql
+    # a separate statement, never a CTE next to the write on the same row
+    assert "WITH" not in lock_sql
+    assert lock_sql.rstrip().endswith("FOR UPDATE")
+
+@patch("src.routes.post.RatingService")
+def test_rate_post_route(mock_service_class):
+    user = Principal(id=uuid4(), username="rater", status="active", roles=frozenset({"user"}), permissions=frozenset())
+    post_id = uuid4()
+    mock_service = mock_service_class.return_value
+    mock_service.rate_post = AsyncMock(return_value=RatingResponse(
+        post_id=post_id, rating=4, created=True, avg_rating=4.0, rating_count=1
+    ))
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    client = TestClient(app)
+    response = client.post(f"/posts/{post_id}/rating", json={"rating": 4})
+    invalid = client.post(f"/posts/{post_id}/rating", json={"rating": 6})
+    app.dependency_overrides.pop(get_current_user)
+
+    assert response.status_code == 200
+    assert response.json()["avg_rating"] == 4.0
+    assert invalid.status_code == 422
+    mock_service.rate_post.assert_awaited_once()
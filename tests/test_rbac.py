@@ -0,0 +1,46 @@
+from src.core.principal import Principal
+from src.core.rbac import BitRegistry, load_rbac_bits, permission_bits, role_bits
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+def test_bit_registry_interns_stable_bits():
+    registry = BitRegistry()
+
+    first = registry.bit("update_all_posts")
+    second = registry.bit("delete_all_posts")
+
+    assert first != second
+    assert registry.bit("update_all_posts") == first
+    assert registry.mask(["update_all_posts", "delete_all_posts"]) == first | second
+    assert registry.names(first | second) == {"update_all_posts", "delete_all_posts"}
+
+def test_principal_masks_follow_names():
+    principal = Principal(
+        id=uuid4(),
+        username="tester",
+        status="active",
+        roles=frozenset({"moderator"}),
+        permissions=frozenset({"update_all_posts"}),
+    )
+
+    assert principal.role_mask & role_bits.bit("moderator")
+    assert not principal.role_mask & role_bits.bit("admin")
+    assert principal.permission_mask & permission_bits.bit("update_all_posts")
+    assert not principal.permission_mask & permission_bits.bit("delete_all_posts")
+
+@pytest.mark.asyncio
+async def test_load_rbac_bits_interns_table_names():
+    roles_result = MagicMock()
+    roles_result.scalars.return_value = ["rbac_loaded_role"]
+    permissions_result = MagicMock()
+    permissions_result.scalars.return_value = ["rbac_loaded_permission"]
+
+    db = AsyncMock()
+    db.execute.side_effect = [roles_result, permissions_result]
+
+    await load_rbac_bits(db)
+
+    assert "rbac_loaded_role" in role_bits.names(-1)
+    assert "rbac_loaded_permission" in permission_bits.names(-1)
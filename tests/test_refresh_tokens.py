@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy import select
+from src.conf.config import settings
+from src.core.principal import Principal, principal_cache
+from src.core.security import security
+from src.database.models import RefreshToken, UserStatusEnum
+from src.repositories.refresh_token import RefreshTokenRepository
+from src.services.auth import TokenService
+from uuid import uuid4
+
+import pytest
+
+async def stored_token(db_session, token):
+    return await db_session.scalar(
+        select(RefreshToken).where(RefreshToken.token == security.hash_token(token))
+    )
+
+def test_refresh_token_expires_in_days():
+    token = security.create_token('refresh', uuid4())
+    payload = jwt.decode(token, settings.REFRESH_SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    lifetime = datetime.fromtimestamp(payload["exp"]) - datetime.now()
+    assert lifetime > timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS) - timedelta(minutes=1)
+    assert payload["jti"] != jwt.get_unverified_claims(security.create_token('refresh', uuid4()))["jti"]
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_the_token(db_session, test_user):
+    service = TokenService(RefreshTokenRepository(db_session))
+    issued = await service.issue(Principal.from_user(test_user))
+
+    row = await stored_token(db_session, issued["refresh_token"])
+    assert row is not None and row.token != issued["refresh_token"]
+
+    renewed = await service.refresh(issued["refresh_token"])
+    await db_session.refresh(row)
+
+    assert renewed["refresh_token"] != issued["refresh_token"]
+    assert row.revoked_at is not None
+    assert (await stored_token(db_session, renewed["refresh_token"])).family_id == row.family_id
+
+    access = jwt.decode(renewed["access_token"], settings.SECRET_KEY, algorithms=["HS256"])
+    assert access["sub"] == str(test_user.id)
+
+@pytest.mark.asyncio
+async def test_reused_refresh_token_revokes_the_family(db_session, test_user):
+    service = TokenService(RefreshTokenRepository(db_session))
+    issued = await service.issue(Principal.from_user(test_user))
+    renewed = await service.refresh(issued["refresh_token"])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.refresh(issued["refresh_token"])
+
+    assert exc_info.value.detail == "Refresh token reuse detected"
+
+    # the token rotated to by the legitimate client is gone too
+    with pytest.raises(HTTPException) as exc_info:
+        await service.refresh(renewed["refresh_token"])
+
+    assert exc_info.value.detail == "Refresh token reuse detected"
+
+@pytest.mark.asyncio
+async def test_unknown_or_forged_refresh_token(db_session):
+    service = TokenService(RefreshTokenRepository(db_session))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.refresh(security.create_token('refresh', uuid4()))
+    assert exc_info.value.detail == "Invalid refresh token"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.refresh(security.create_token('access', uuid4()))
+    assert exc_info.value.status_code == 401
+
+@pytest.mark.asyncio
+async def test_refresh_refused_for_inactive_user(db_session, test_user):
+    service = TokenService(RefreshTokenRepository(db_session))
+    issued = await service.issue(Principal.from_user(test_user))
+
+    test_user.status = UserStatusEnum.ban
+    await db_session.commit()
+    principal_cache.invalidate(test_user.id)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.refresh(issued["refresh_token"])
+
+    assert exc_info.value.status_code == 403
+    principal_cache.invalidate(test_user.id)
+
+@pytest.mark.asyncio
+async def test_purge_expired_in_batches(db_session, test_user):
+    now = datetime.now()
+    expired = [
+        RefreshToken(user_id=test_user.id, token=uuid4().hex, expires_at=now - timedelta(days=1))
+        for _ in range(3)
+    ]
+    valid = RefreshToken(user_id=test_user.id, token=uuid4().hex, expires_at=now + timedelta(days=1))
+    db_session.add_all([*expired, valid])
+    await db_session.commit()
+
+    repo = RefreshTokenRepository(db_session)
+    batches = []
+    while not batches or batches[-1] == 2:
+        batches.append(await repo.purge_expired(batch_size=2))
+
+    assert sum(batches) >= 3
+    assert await db_session.scalar(select(RefreshToken.id).where(RefreshToken.id == valid.id)) == valid.id
+    assert await db_session.scalar(
+        select(RefreshToken.id).where(RefreshToken.expires_at <= datetime.now())
+    ) is None
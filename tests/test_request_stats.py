@@ -0,0 +1,94 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from main import app
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.conf.config import settings
+from src.core.request_stats import (
+    RequestMetrics, RequestStats, RequestStatsMiddleware, current_request_stats, instrument_engine
+)
+from unittest.mock import patch
+
+import pytest
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+async def run_statements(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        await conn.execute(text("INSERT INTO items (name) VALUES ('a'), ('b'), ('c')"))
+        await conn.execute(text("UPDATE items SET name = 'z' WHERE id < 3"))
+        await conn.execute(text("SELECT * FROM items"))
+
+@pytest.mark.asyncio
+async def test_engine_hooks_count_statements_for_the_current_request():
+    engine = create_async_engine(DATABASE_URL)
+    instrument_engine(engine.sync_engine)
+
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        await run_statements(engine)
+    finally:
+        current_request_stats.reset(token)
+
+    # work outside a request is not attributed to it
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+
+    assert stats.statements == 4
+    assert stats.db_seconds > 0
+    assert stats.rows == 5
+    assert stats.slow == []
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_kept_past_the_threshold():
+    engine = create_async_engine(DATABASE_URL)
+    instrument_engine(engine.sync_engine)
+    stats = RequestStats()
+
+    with patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 0):
+        token = current_request_stats.set(stats)
+        try:
+            await run_statements(engine)
+        finally:
+            current_request_stats.reset(token)
+    await engine.dispose()
+
+    assert any(statement.startswith("UPDATE items") for _, statement in stats.slow)
+
+def test_middleware_adds_server_timing_and_records_metrics():
+    engine = create_async_engine(DATABASE_URL)
+    instrument_engine(engine.sync_engine)
+
+    probe = FastAPI()
+    probe.add_middleware(RequestStatsMiddleware)
+
+    @probe.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        await run_statements(engine)
+        return {"id": item_id}
+
+    metrics = RequestMetrics()
+    with patch("src.core.request_stats.request_metrics", metrics):
+        response = TestClient(probe).get("/items/7")
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("total;dur=")
+    assert 'db;dur=' in timing and '5 rows"' in timing
+
+    rendered = metrics.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 1' in rendered
+    assert 'http_request_db_rows_total{method="GET",route="/items/{item_id}"} 5' in rendered
+
+def test_metrics_endpoint_is_prometheus_text():
+    client = TestClient(app)
+    client.get("/health/db-pool")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/health/db-pool"' in response.text
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
@@ -0,0 +1,167 @@
+from contextlib import asynccontextmanager
+from fastapi.testclient import TestClient
+from main import app
+from src.core.response_cache import (
+    CachedResponse, MemoryCacheBackend, NullCacheBackend, RedisCacheBackend, ResponseCache,
+    build_response_cache
+)
+from src.database.db import get_session_factory
+from src.schemas.post import PostResponse
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import asyncio, pytest
+
+@pytest.fixture
+async def resp_server():
+    # just enough of the redis protocol for GET / SET EX / INCRBY
+    store = {}
+
+    async def read_command(reader):
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def handle(reader, writer):
+        while (args := await read_command(reader)) is not None:
+            command = args[0].upper()
+            if command == b"GET":
+                value = store.get(args[1])
+                writer.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value))
+            elif command == b"SET":
+                store[args[1]] = args[2]
+                writer.write(b"+OK\r\n")
+            elif command in (b"INCR", b"INCRBY"):
+                amount = int(args[2]) if len(args) > 2 else 1
+                store[args[1]] = b"%d" % (int(store.get(args[1], b"0")) + amount)
+                writer.write(b":%s\r\n" % store[args[1]])
+            else:
+                writer.write(b"+OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f"redis://127.0.0.1:{port}/0", store
+    server.close()
+    await server.wait_closed()
+
+@pytest.mark.asyncio
+async def test_memory_cache_invalidation_retires_entries():
+    cache = ResponseCache(MemoryCacheBackend(maxsize=8), ttl=30)
+
+    key = await cache.entry_key("posts", "feed")
+    await cache.set(key, CachedResponse(b"[1]", {"X-Next-Cursor": "abc"}))
+
+    hit = await cache.get(await cache.entry_key("posts", "feed"))
+    assert hit == CachedResponse(b"[1]", {"X-Next-Cursor": "abc"})
+
+    await cache.invalidate("posts")
+
+    assert await cache.get(await cache.entry_key("posts", "feed")) is None
+
+@pytest.mark.asyncio
+async def test_key_resolved_before_invalidation_stays_retired():
+    cache = ResponseCache(MemoryCacheBackend(maxsize=8), ttl=30)
+
+    # a read that started before a write must not repopulate the new generation
+    stale_key = await cache.entry_key("posts", "feed")
+    await cache.invalidate("posts")
+    await cache.set(stale_key, CachedResponse(b"stale"))
+
+    assert await cache.get(await cache.entry_key("posts", "feed")) is None
+
+@pytest.mark.asyncio
+async def test_redis_backend_round_trip(resp_server):
+    url, store = resp_server
+    cache = ResponseCache(RedisCacheBackend(url), ttl=30)
+
+    key = await cache.entry_key("posts", "post:1")
+    await cache.set(key, CachedResponse(b'{"id": 1}'))
+
+    assert (await cache.get(key)).body == b'{"id": 1}'
+
+    await cache.invalidate("posts")
+
+    assert store[b"photo-share:posts:generation"] == b"1"
+    assert await cache.get(await cache.entry_key("posts", "post:1")) is None
+    await cache.close()
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_degrades_to_miss():
+    cache = ResponseCache(RedisCacheBackend("redis://127.0.0.1:1/0"), ttl=30)
+
+    key = await cache.entry_key("posts", "feed")
+
+    assert key is None
+    assert await cache.get(key) is None
+    await cache.set(key, CachedResponse(b"[]"))
+    await cache.invalidate("posts")
+    await cache.close()
+
+@pytest.mark.parametrize("workers, backend_class", [(1, MemoryCacheBackend), (4, NullCacheBackend)])
+def test_memory_backend_only_for_a_single_worker(workers, backend_class):
+    with patch("src.core.response_cache.settings.RESPONSE_CACHE_BACKEND", "memory"), \
+            patch("src.core.response_cache.settings.WEB_CONCURRENCY", workers):
+        cache = build_response_cache()
+
+    assert isinstance(cache.backend, backend_class)
+
+def test_get_post_served_from_cache_until_invalidated():
+    post = PostResponse(id=uuid4(), title="Cached", user_id=uuid4(), image_url="http://example.com/x.jpg")
+    opened = []
+
+    @asynccontextmanager
+    async def session_factory():
+        opened.append(True)
+        yield None
+
+    cache = ResponseCache(MemoryCacheBackend(maxsize=8), ttl=30)
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+    with patch("src.routes.post.response_cache", cache), \
+            patch("src.routes.post.PostService") as service_class:
+        service_class.return_value.get_post_by_id = AsyncMock(return_value=post)
+        service_class.return_value.get_post_version = AsyncMock(return_value=[(post.id, None, 0, 0, None)])
+        client = TestClient(app)
+
+        first = client.get(f"/posts/{post.id}")
+        second = client.get(f"/posts/{post.id}")
+        asyncio.run(cache.invalidate("posts"))
+        third = client.get(f"/posts/{post.id}")
+
+    app.dependency_overrides.pop(get_session_factory)
+
+    assert first.json() == second.json() == third.json()
+    assert first.json()["title"] == "Cached"
+    assert len(opened) == 2
+
+def test_get_posts_cache_keeps_next_cursor():
+    posts = [PostResponse(id=uuid4(), title="Feed", user_id=uuid4(), image_url="http://example.com/x.jpg")]
+
+    @asynccontextmanager
+    async def session_factory():
+        yield None
+
+    cache = ResponseCache(MemoryCacheBackend(maxsize=8), ttl=30)
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+    with patch("src.routes.post.response_cache", cache), \
+            patch("src.routes.post.PostService") as service_class:
+        service_class.return_value.get_posts_page = AsyncMock(return_value=(posts, "next"))
+        service_class.return_value.get_posts_page_version = AsyncMock(return_value=[(posts[0].id, None, 0, 0, None)])
+        client = TestClient(app)
+
+        first = client.get("/posts/", params={"limit": 1})
+        second = client.get("/posts/", params={"limit": 1})
+
+    app.dependency_overrides.pop(get_session_factory)
+
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"] == "next"
+    assert second.json()[0]["title"] == "Feed"
+    service_class.return_value.get_posts_page.assert_awaited_once_with(1, None)
@@ -0,0 +1,120 @@
+from contextlib import asynccontextmanager
+from fastapi.testclient import TestClient
+from main import app
+from sqlalchemy.dialects import postgresql
+from src.core.response_cache import NullCacheBackend, ResponseCache
+from src.database.db import get_session_factory
+from src.repositories.post import PostRepository
+from src.schemas.post import PostCreateModel, PostResponse
+from src.schemas.tag import TagsShortResponse
+from src.services.post import PostService
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+async def create_post(repo, user, title, description, *tags):
+    return await repo.create(
+        PostCreateModel(
+            title=title,
+            description=description,
+            image_url="http://example.com/search.jpg",
+            tags=[TagsShortResponse(name=name) for name in tags]
+        ),
+        user
+    )
+
+@pytest.mark.asyncio
+async def test_search_matches_title_description_and_tags(db_session, test_user):
+    word = f"w{uuid4().hex[:8]}"
+    repo = PostRepository(db_session)
+    in_title = await create_post(repo, test_user, f"{word.upper()} at dusk", "plain")
+    in_description = await create_post(repo, test_user, "Evening", f"a {word} by the lake")
+    in_tag = await create_post(repo, test_user, "Morning", "plain", f"{word}-tag")
+    await create_post(repo, test_user, "Unrelated", "plain")
+
+    service = PostService(repo)
+    posts, next_offset = await service.search_posts(word, 10)
+
+    assert {post.id for post in posts} == {in_title.id, in_description.id, in_tag.id}
+    assert next_offset is None
+
+    # every term has to match somewhere
+    both, _ = await service.search_posts(f"{word} lake", 10)
+    assert [post.id for post in both] == [in_description.id]
+
+@pytest.mark.asyncio
+async def test_search_pages_by_offset(db_session, test_user):
+    word = f"p{uuid4().hex[:8]}"
+    repo = PostRepository(db_session)
+    for i in range(3):
+        await create_post(repo, test_user, f"{word} {i}", "paged")
+
+    service = PostService(repo)
+    first, next_offset = await service.search_posts(word, 2)
+    second, last_offset = await service.search_posts(word, 2, next_offset)
+
+    assert (len(first), next_offset) == (2, 2)
+    assert (len(second), last_offset) == (1, None)
+    assert not {post.id for post in first} & {post.id for post in second}
+
+@pytest.mark.asyncio
+async def test_search_stops_paging_at_max_offset():
+    repo = MagicMock()
+    repo.search_posts = AsyncMock(return_value=[
+        PostResponse(id=uuid4(), title="hit", user_id=uuid4(), image_url="http://example.com/x.jpg")
+        for _ in range(3)
+    ])
+    service = PostService(repo)
+
+    with patch("src.services.post.settings.SEARCH_MAX_OFFSET", 10):
+        _, within = await service.search_posts("hit", 2, 8)
+        _, beyond = await service.search_posts("hit", 2, 9)
+
+    assert within == 10
+    assert beyond is None
+
+@pytest.mark.asyncio
+async def test_search_treats_wildcards_literally(db_session, test_user):
+    repo = PostRepository(db_session)
+    await create_post(repo, test_user, "Percent", "100% sure")
+
+    posts, _ = await PostService(repo).search_posts("%", 50)
+
+    assert posts and all("%" in post.title + post.description for post in posts)
+    assert await PostService(repo).search_posts("   ", 10) == ([], None)
+
+def test_postgresql_search_uses_the_search_vector():
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+    stmt = PostRepository(db)._search("sunset beach")
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "posts.search_vector @@ websearch_to_tsquery" in sql
+    assert "ORDER BY ts_rank_cd(posts.search_vector, websearch_to_tsquery" in sql
+
+def test_search_route_is_not_taken_for_a_post_id():
+    posts = [PostResponse(id=uuid4(), title="Found", user_id=uuid4(), image_url="http://example.com/x.jpg")]
+
+    @asynccontextmanager
+    async def session_factory():
+        yield None
+
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+    with patch("src.routes.post.response_cache", ResponseCache(NullCacheBackend(), ttl=30)), \
+            patch("src.routes.post.PostService") as service_class:
+        service = service_class.return_value
+        service.search_posts = AsyncMock(return_value=(posts, 20))
+
+        client = TestClient(app)
+        response = client.get("/posts/search", params={"q": "found"})
+        missing_query = client.get("/posts/search")
+
+    app.dependency_overrides.pop(get_session_factory)
+
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Found"
+    assert response.headers["X-Next-Offset"] == "20"
+    assert missing_query.status_code == 422
+    service.search_posts.assert_awaited_once_with("found", 20, 0)
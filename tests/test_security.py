@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from jose.exceptions import ExpiredSignatureError, JWTError
+from src.conf.config import settings
+from src.core.security import HS256Codec, JoseCodec, Security, security
+from src.core.workers import BoundedWorkerPool
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import asyncio, base64, pytest, threading, time
+
+@pytest.mark.asyncio
+async def test_password_hash_roundtrip_off_loop():
+    hashed = await security.get_password_hash_async("123456")
+
+    assert await security.verify_password_async("123456", hashed) is True
+    assert await security.verify_password_async("wrong", hashed) is False
+
+@pytest.mark.asyncio
+async def test_hashing_pool_runs_in_worker_thread():
+    pool = BoundedWorkerPool(max_workers=1, max_pending=1, name="password-hash")
+
+    thread_name = await pool.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("password-hash")
+    assert pool.pending == 0
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_saturated():
+    pool = BoundedWorkerPool(max_workers=1, max_pending=1, name="password-hash")
+    release = threading.Event()
+
+    busy = asyncio.create_task(pool.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(lambda: None)
+
+    release.set()
+    await busy
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+    assert pool.pending == 0
+
+@pytest.mark.parametrize("encoder, decoder", [
+    (JoseCodec("HS256"), HS256Codec()),
+    (HS256Codec(), JoseCodec("HS256")),
+    (HS256Codec(), HS256Codec()),
+])
+def test_token_codecs_are_interchangeable(encoder, decoder):
+    token = encoder.encode({"sub": "user", "roles": ["user"], "exp": datetime.now() + timedelta(minutes=5)}, "key")
+
+    claims = decoder.decode(token, "key")
+
+    assert (claims["sub"], claims["roles"]) == ("user", ["user"])
+
+@pytest.mark.parametrize("codec", [JoseCodec("HS256"), HS256Codec()])
+def test_token_codecs_reject_bad_tokens(codec):
+    expired = codec.encode({"sub": "user", "exp": datetime.now() - timedelta(minutes=5)}, "key")
+    valid = codec.encode({"sub": "user", "exp": datetime.now() + timedelta(minutes=5)}, "key")
+    header, payload, signature = valid.split(".")
+
+    with pytest.raises(ExpiredSignatureError):
+        codec.decode(expired, "key")
+
+    # headers that are valid JSON but not an object
+    odd_headers = [
+        base64.urlsafe_b64encode(value).rstrip(b"=").decode() for value in (b"[]", b"1", b'"x"')
+    ]
+
+    for token in (
+        valid.replace(payload, payload[::-1]),
+        f"{header}.{payload}",
+        "garbage",
+        *(f"{odd}.{payload}.{signature}" for odd in odd_headers)
+    ):
+        with pytest.raises(JWTError):
+            codec.decode(token, "key")
+
+    with pytest.raises(JWTError):
+        codec.decode(valid, "other key")
+
+def test_access_token_decode_is_cached_until_expiry(monkeypatch):
+    codec = MagicMock(wraps=HS256Codec())
+    tokens = Security(codec=codec)
+    token = codec.encode({"sub": "user", "exp": datetime.now() + timedelta(minutes=1)}, settings.SECRET_KEY)
+
+    first = tokens.decode_access_token(token)
+    second = tokens.decode_access_token(token)
+
+    assert second is first
+    assert codec.decode.call_count == 1
+
+    # two minutes later the cached entry is gone with the token's lifetime
+    now, clock = time.time(), time.monotonic()
+    monkeypatch.setattr("src.core.security.time", lambda: now + 120)
+    monkeypatch.setattr("src.core.cache.monotonic", lambda: clock + 120)
+
+    with pytest.raises(ExpiredSignatureError):
+        tokens.decode_access_token(token)
+
+    assert codec.decode.call_count == 2
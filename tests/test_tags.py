@@ -0,0 +1,154 @@
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from main import app
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.expression import Delete
+from src.core.principal import Principal
+from src.database.models import Base, Tag, User, UserStatusEnum
+from src.repositories.post import PostRepository
+from src.repositories.tag import TagRepository
+from src.schemas.post import PostCreateModel
+from src.schemas.tag import TagResponse, TagsShortResponse
+from src.services.tag import TagService
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+
+async def create_tagged(repo, user, *names):
+    return await repo.create(
+        PostCreateModel(
+            title="Tagged",
+            description="Browse",
+            image_url="http://example.com/tagged.jpg",
+            tags=[TagsShortResponse(name=name) for name in names]
+        ),
+        user
+    )
+
+async def post_count(db_session, name):
+    return await db_session.scalar(select(Tag.post_count).where(Tag.name == name))
+
+@pytest.mark.asyncio
+async def test_tag_post_counts_follow_create_and_delete(db_session, test_user):
+    suffix = uuid4().hex[:8]
+    shared, single = f"shared-{suffix}", f"single-{suffix}"
+    repo = PostRepository(db_session)
+
+    first = await create_tagged(repo, test_user, shared, single, shared)
+    await create_tagged(repo, test_user, shared)
+
+    assert await post_count(db_session, shared) == 2
+    assert await post_count(db_session, single) == 1
+
+    assert await repo.delete_post(first.id)
+    assert await repo.delete_post(first.id) is False
+
+    assert await post_count(db_session, shared) == 1
+    assert await post_count(db_session, single) == 0
+
+@pytest.mark.asyncio
+async def test_tag_post_counts_follow_cascaded_deletes():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        author = User(id=uuid4(), username="leaving", email="leaving@example.com", password="x",
+                      status=UserStatusEnum.active)
+        session.add(author)
+        await session.commit()
+
+        principal = Principal(id=author.id, username=author.username, status="active",
+                              roles=frozenset({"user"}), permissions=frozenset())
+        repo = PostRepository(session)
+        await create_tagged(repo, principal, "cascade", "other")
+        await create_tagged(repo, principal, "cascade")
+        assert await post_count(session, "cascade") == 2
+
+        # deleting the author removes posts and tag links by ON DELETE CASCADE only
+        await session.execute(Delete(User).where(User.id == author.id))
+        await session.commit()
+
+        assert await post_count(session, "cascade") == 0
+        assert await post_count(session, "other") == 0
+
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_rejected_delete_keeps_tag_counts(db_session, test_user):
+    name = f"kept-{uuid4().hex[:8]}"
+    repo = PostRepository(db_session)
+    post = await create_tagged(repo, test_user, name)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await repo.delete_post(post.id, owner_id=uuid4())
+
+    assert exc_info.value.status_code == 403
+    assert await post_count(db_session, name) == 1
+
+@pytest.mark.asyncio
+async def test_tag_posts_page_newest_first(db_session, test_user):
+    name = f"paged-{uuid4().hex[:8]}"
+    repo = PostRepository(db_session)
+    created = [await create_tagged(repo, test_user, name) for _ in range(5)]
+    await create_tagged(repo, test_user, f"other-{uuid4().hex[:8]}")
+
+    service = TagService(TagRepository(db_session))
+    first, cursor = await service.get_tag_posts_page(name, 3)
+    second, last_cursor = await service.get_tag_posts_page(name, 3, cursor)
+
+    expected = [post.id for post in reversed(created)]
+    assert [post.id for post in first + second] == expected
+    assert all(tag.name == name for post in first for tag in post.tags)
+    assert cursor is not None and last_cursor is None
+
+@pytest.mark.asyncio
+async def test_tag_posts_unknown_tag(db_session):
+    with pytest.raises(HTTPException) as exc_info:
+        await TagService(TagRepository(db_session)).get_tag_posts_page(f"missing-{uuid4().hex}", 10)
+
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_suggest_tags_by_prefix(db_session, test_user):
+    prefix = f"sg{uuid4().hex[:6]}"
+    repo = PostRepository(db_session)
+    await create_tagged(repo, test_user, f"{prefix}_sea", f"{prefix}_sky")
+    await create_tagged(repo, test_user, f"{prefix}_sea", f"{prefix}xsand")
+    db_session.add(Tag(name=f"{prefix}_unused"))
+    await db_session.commit()
+
+    tags = await TagRepository(db_session).suggest_tags(f"{prefix}_", 10)
+
+    # "_" is matched literally and tags without posts are not suggested
+    assert tags == [
+        TagResponse(name=f"{prefix}_sea", post_count=2),
+        TagResponse(name=f"{prefix}_sky", post_count=1),
+    ]
+    assert await TagRepository(db_session).suggest_tags(f"{prefix}%", 10) == []
+
+@patch("src.routes.tag.TagService")
+def test_tag_routes(mock_service_class):
+    mock_service = mock_service_class.return_value
+    mock_service.suggest_tags = AsyncMock(return_value=[TagResponse(name="nature", post_count=3)])
+    mock_service.get_tag_posts_page = AsyncMock(return_value=([], "next"))
+
+    client = TestClient(app)
+    suggestions = client.get("/tags/autocomplete", params={"q": "nat"})
+    page = client.get("/tags/nature/posts", params={"limit": 5})
+    empty_query = client.get("/tags/autocomplete", params={"q": ""})
+
+    assert suggestions.json() == [{"name": "nature", "post_count": 3}]
+    assert page.status_code == 200
+    assert page.headers["X-Next-Cursor"] == "next"
+    assert empty_query.status_code == 422
+    mock_service.suggest_tags.assert_awaited_once_with("nat", 10)
+    mock_service.get_tag_posts_page.assert_awaited_once_with("nature", 5, None)
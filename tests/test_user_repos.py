@@ -1,5 +1,6 @@
 from datetime import datetime
 from fastapi import HTTPException
+from src.core.principal import Principal, principal_cache
 from src.database.models import User, Role
 from src.schemas.user import UserProfileResponse
 from src.repositories.user import UserRepository
@@ -58,9 +59,23 @@ async def test_get_user_profile_by_username_success(async_fake_db):
     posts_count = 5
     comments_count = 12
 
-    result_mock = MagicMock()
-    result_mock.first.return_value = (user, posts_count, comments_count)
-    async_fake_db.execute = AsyncMock(return_value=result_mock)
+    profile_result = MagicMock()
+    profile_result.mappings.return_value.first.return_value = {
+        "id": user.id,
+        "username": user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "email": user.email,
+        "img_link": user.img_link,
+        "phone": user.phone,
+        "status": user.status,
+        "created_at": user.created_at,
+        "posts_count": posts_count,
+        "comments_count": comments_count,
+    }
+    roles_result = MagicMock()
+    roles_result.all.return_value = [(role.id, role.name) for role in user.roles]
+    async_fake_db.execute = AsyncMock(side_effect=[profile_result, roles_result])
 
     repo = UserRepository(async_fake_db)
 
@@ -78,7 +93,7 @@ async def test_get_user_profile_by_username_success(async_fake_db):
     assert profile.posts_count == posts_count
     assert profile.comments_count == comments_count
     assert profile.email == user.email
-    async_fake_db.execute.assert_called_once()
+    assert async_fake_db.execute.await_count == 2
 
 @pytest.mark.asyncio
 async def test_get_user_profile_by_username_not_found(async_fake_db):
@@ -86,7 +101,7 @@ async def test_get_user_profile_by_username_not_found(async_fake_db):
 
     # Simuliere: result.first() gibt None zurück
     result_mock = MagicMock()
-    result_mock.first.return_value = None
+    result_mock.mappings.return_value.first.return_value = None
     async_fake_db.execute = AsyncMock(return_value=result_mock)
 
     repo = UserRepository(async_fake_db)
@@ -129,3 +144,12 @@ async def test_get_all_users(db_session, test_user):
     repo = UserRepository(db_session)
     users = await repo.get_all_users()
     assert len(users) >= 1
+
+@pytest.mark.asyncio
+async def test_update_user_status_invalidates_cached_principal(db_session, test_user):
+    principal_cache.set(test_user.id, Principal.from_user(test_user))
+
+    repo = UserRepository(db_session)
+    await repo.update_user_status(test_user.id, UserUpdateStatusRequest(status="ban"))
+
+    assert principal_cache.get(test_user.id) is None